@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+# barrido parametrico de kd/kp para el modelo de un taller (parte-2-1, gen-1.py --barrido)
+# el coste de una solucion con el conjunto S de buses atendidos es
+#   kd * D(S) + kp * (P - P(S))       D(S) distancia atendida, P(S) pasajeros atendidos, P total
+# asi que el plan optimo solo depende de la razon r = kd/kp: se atienden los (como mucho) n buses
+# con mas p[a] - r*d[a] > 0. g(r) = max_S (P(S) - r*D(S)) es convexa y lineal a trozos en r, y sus
+# puntos de ruptura son las razones en las que cambia el plan optimo. Se calculan de forma exacta
+# (enteros y fracciones) intersecando rectas de g, con una resolucion nativa por punto de ruptura; despues
+# cada (kd, kp) se evalua en O(log tramos) sin volver a resolver
+
+import math, bisect, heapq
+from fractions import Fraction
+
+# plan optimo para la razon r = num/den (den > 0): (buses atendidos 0-indexados, pasajeros atendidos,
+# distancia atendida); el ahorro p - r*d se compara multiplicado por den, todo en enteros
+def _mejor(num, den, franjas, distancias, pasajeros):
+    ahorros = [p * den - num * d for d, p in zip(distancias, pasajeros)]
+    candidatos = (bus for bus, ahorro in enumerate(ahorros) if ahorro > 0)
+    elegidos = tuple(sorted(heapq.nlargest(franjas, candidatos, key=ahorros.__getitem__)))
+    return elegidos, sum(pasajeros[bus] for bus in elegidos), sum(distancias[bus] for bus in elegidos)
+
+# puntos de ruptura de g entre dos planes optimos (en izquierda y derecha del intervalo)
+# la recta de un plan es P(S) - r*D(S); si el plan optimo en la interseccion de las dos rectas no
+# esta por encima de ellas, la interseccion es el unico punto de ruptura del intervalo
+def _rupturas(izquierda, derecha, franjas, distancias, pasajeros, rupturas):
+    pendientes = [(izquierda, derecha)]
+    while pendientes: # intervalos por explorar (sin recursion: puede haber muchos tramos)
+        izquierda, derecha = pendientes.pop()
+        _, p_izq, d_izq = izquierda
+        _, p_der, d_der = derecha
+        if d_izq == d_der: # rectas paralelas (la misma, por ser las dos optimas) --> sin ruptura
+            continue
+        num, den = p_izq - p_der, d_izq - d_der # interseccion de las dos rectas
+        if den < 0:
+            num, den = -num, -den
+        medio = _mejor(num, den, franjas, distancias, pasajeros)
+        if medio[1] * den - num * medio[2] <= p_izq * den - num * d_izq: # ningun plan mejor --> r es ruptura
+            rupturas.append(Fraction(num, den))
+        else: # hay un plan mejor en medio --> dos intervalos
+            pendientes.extend(((izquierda, medio), (medio, derecha)))
+
+# tramos de la razon kd/kp con su plan optimo: lista de (desde, hasta, buses atendidos 1-indexados,
+# distancia atendida, pasajeros sin atender); el primero empieza en 0 y el ultimo acaba en infinito
+# (None). En cada tramo el coste es kd * distancia atendida + kp * pasajeros sin atender
+def tramos(franjas, distancias, pasajeros):
+    # aritmetica exacta: los datos (floats, racionales de denominador potencia de 2) se escalan a
+    # enteros con el mismo factor, que no cambia las razones
+    fracciones = [Fraction(valor) for valor in list(distancias) + list(pasajeros)]
+    escala = math.lcm(*(fraccion.denominator for fraccion in fracciones))
+    enteros = [int(fraccion * escala) for fraccion in fracciones]
+    distancias, pasajeros = enteros[:len(distancias)], enteros[len(distancias):]
+    # a partir de la mayor razon p/d ningun bus con distancia ahorra: el plan ya no cambia
+    limite = max((Fraction(p, d) for d, p in zip(distancias, pasajeros) if d > 0), default=Fraction(0)) + 1
+    inicio = _mejor(0, 1, franjas, distancias, pasajeros)
+    fin = _mejor(limite.numerator, limite.denominator, franjas, distancias, pasajeros)
+    rupturas = []
+    _rupturas(inicio, fin, franjas, distancias, pasajeros, rupturas)
+    rupturas = sorted(set(r for r in rupturas if r > 0)) # un empate en r = 0 no abre tramo
+
+    resultado = []
+    extremos = [Fraction(0)] + rupturas + [None]
+    for desde, hasta in zip(extremos, extremos[1:]): # plan en el interior de cada tramo
+        r = limite if hasta is None else (desde + hasta) / 2
+        elegidos, atendidos, distancia = _mejor(r.numerator, r.denominator, franjas, distancias, pasajeros)
+        resultado.append((desde, hasta, [bus + 1 for bus in elegidos], Fraction(distancia, escala),
+                          Fraction(sum(pasajeros) - atendidos, escala)))
+    return resultado
+
+# coste y buses atendidos de cada escenario (kd, kp) a partir de los tramos, una busqueda binaria
+# por escenario; con kp = 0 la razon es infinita: ultimo tramo (solo buses a distancia 0, gratis)
+def evaluar(lista_tramos, escenarios):
+    desdes = [tramo[0] for tramo in lista_tramos]
+    resultado = []
+    for coste_distancia, coste_pasajeros in escenarios: # cada escenario
+        if coste_pasajeros > 0: # en un punto de ruptura los dos planes cuestan lo mismo, se toma el de la derecha
+            indice = bisect.bisect_right(desdes, Fraction(coste_distancia) / Fraction(coste_pasajeros)) - 1
+        else:
+            indice = len(lista_tramos) - 1
+        _, _, asignados, distancia, sin_atender = lista_tramos[indice]
+        coste = coste_distancia * float(distancia) + coste_pasajeros * float(sin_atender)
+        resultado.append((coste, asignados))
+    return resultado
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# benchmark de escalado: resuelve cada instancia (p.ej. las de generador.py) por cada camino de
+# resolucion de gen-1.py / gen-2.py, de principio a fin y por fases (--perfil), y guarda el
+# objetivo y el gap. Escribe una tabla comparativa y un fichero de linea base con el que comparar
+# ejecuciones posteriores para detectar regresiones de rendimiento o de calidad de la heuristica
+
+import sys, os, re, json, time, signal, platform, subprocess, tempfile
+from pathlib import Path
+
+import lote
+from comun import Argumentos
+
+USAGE = ("Uso: python benchmark.py <directorio|patron> [--caminos C..] [--repeticiones R] [--limite S]\n"
+         "                         [--tabla FICHERO] [--linea-base FICHERO] [--comparar FICHERO] [--tolerancia T]")
+
+DIRECTORIO = Path(__file__).resolve().parent
+# caminos de resolucion: nombre -> (parte, script, opciones)
+CAMINOS = {
+    "1-glpsol": (1, "gen-1.py", []),
+    "1-nativo": (1, "gen-1.py", ["--nativo"]),
+    "2-completo": (2, "gen-2.py", []),
+    "2-agregado": (2, "gen-2.py", ["--agregado"]),
+    "2-ligero": (2, "gen-2.py", ["--ligero", "--dat-disperso"]),
+    "2-heuristica": (2, "gen-2.py", ["--heuristica"]),
+    "2-exacto": (2, "gen-2.py", ["--exacto"]),
+}
+# fases que se muestran en la tabla; nativo, heuristica, exacto y glpsol van en la misma columna
+FASES_TABLA = ("lectura", "escritura_dat", "resolucion", "lectura_solucion")
+FASES_RESOLUCION = ("glpsol", "nativo", "heuristica", "exacto")
+LIMITE = 60.0 # segundos por ejecucion
+TOLERANCIA = 0.25 # aumento relativo de tiempo que se considera regresion
+MINIMO_S = 0.05 # por debajo de esta diferencia absoluta no se considera regresion (ruido)
+RE_VALOR = re.compile(r"^valor \S+ = (-?[\d.]+)")
+
+# formato de un .in segun los numeros de su primera linea: 2 --> parte 2.1, 3 --> parte 2.2
+def parte_instancia(in_path):
+    with in_path.open("r", encoding="utf-8") as fichero:
+        for linea in fichero: # primera linea no vacia
+            if linea.strip():
+                return 1 if len(linea.replace(",", " ").split()) == 2 else 2
+    return None
+
+# una ejecucion de un camino sobre una instancia; devuelve el registro de la ejecucion
+# real_s es el tiempo de principio a fin (arranque del interprete incluido), las fases salen de --perfil
+# con limite de tiempo se mata el grupo de procesos entero (el script y su glpsol)
+def ejecutar(in_path, camino, dir_trabajo, limite):
+    _, script, opciones = CAMINOS[camino]
+    perfil_path = Path(dir_trabajo) / "perfil.json"
+    perfil_path.unlink(missing_ok=True)
+    orden = [sys.executable, str(DIRECTORIO / script), str(in_path), str(Path(dir_trabajo) / "instancia.dat"),
+             "--sin-cache", "--perfil", str(perfil_path)] + opciones
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen(orden, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, start_new_session=True)
+    try:
+        salida, _ = proceso.communicate(timeout=limite)
+        real = time.perf_counter() - inicio
+    except subprocess.TimeoutExpired: # demasiado lento --> se para y se anota
+        os.killpg(proceso.pid, signal.SIGKILL)
+        proceso.communicate()
+        return {"estado": "LIMITE", "codigo": None, "objetivo": None, "real_s": limite, "fases": {}, "glpsol": {}}
+
+    perfil = json.loads(perfil_path.read_text(encoding="utf-8")) if perfil_path.exists() else {}
+    valor = RE_VALOR.match(salida)
+    fases = {}
+    for nombre, metricas_fase in perfil.get("fases", {}).items(): # tiempo real de cada fase
+        nombre = "resolucion" if nombre in FASES_RESOLUCION else nombre
+        fases[nombre] = fases.get(nombre, 0.0) + metricas_fase["real_s"]
+    return {
+        "estado": perfil.get("estado", "ERROR"),
+        "codigo": proceso.returncode,
+        "objetivo": float(valor.group(1)) if valor else None,
+        "real_s": real,
+        "fases": fases,
+        "glpsol": perfil.get("glpsol", {}),
+    }
+
+# resolver cada instancia por cada camino de su formato; con varias repeticiones se queda la
+# ejecucion de tiempo mediano
+def medir(instancias, caminos, repeticiones=1, limite=LIMITE):
+    resultados = []
+    with tempfile.TemporaryDirectory() as dir_trabajo:
+        for in_path in instancias: # cada instancia
+            parte = parte_instancia(in_path)
+            registros = []
+            for camino in caminos: # cada camino del formato de la instancia
+                if CAMINOS[camino][0] != parte:
+                    continue
+                ejecuciones = sorted((ejecutar(in_path, camino, dir_trabajo, limite) for _ in range(repeticiones)),
+                                     key=lambda ejecucion: ejecucion["real_s"])
+                registro = dict(ejecuciones[len(ejecuciones) // 2], instancia=in_path.name, camino=camino)
+                registro["real_s_todas"] = [ejecucion["real_s"] for ejecucion in ejecuciones]
+                registros.append(registro)
+                print(f"{in_path.name} {camino}: {registro['estado']} {registro['real_s']:.3f} s", file=sys.stderr)
+            # gap de cada camino respecto al mejor objetivo encontrado para la instancia (todos minimizan)
+            objetivos = [registro["objetivo"] for registro in registros if registro["objetivo"] is not None]
+            mejor = min(objetivos) if objetivos else None
+            for registro in registros: # cada camino de la instancia
+                registro["gap_mejor_pct"] = (None if registro["objetivo"] is None or mejor is None
+                                             else 100.0 * (registro["objetivo"] - mejor) / max(1.0, abs(mejor)))
+            resultados.extend(registros)
+    return resultados
+
+# formatear un numero o un guion si no hay valor
+def _celda(valor, formato):
+    return "-" if valor is None else format(valor, formato)
+
+# tabla comparativa en markdown
+def tabla(resultados):
+    cabecera = ["instancia", "camino", "estado", "objetivo", "gap glpsol %", "gap mejor %", "total s"] + [f"{fase} s" for fase in FASES_TABLA]
+    lineas = ["| " + " | ".join(cabecera) + " |", "|" + "---|" * len(cabecera)]
+    for registro in resultados: # una fila por instancia y camino
+        celdas = [registro["instancia"], registro["camino"], registro["estado"], _celda(registro["objetivo"], ".2f"),
+                  _celda(registro["glpsol"].get("gap_pct"), ".1f"), _celda(registro["gap_mejor_pct"], ".2f"),
+                  _celda(registro["real_s"], ".3f")] + [_celda(registro["fases"].get(fase), ".3f") for fase in FASES_TABLA]
+        lineas.append("| " + " | ".join(celdas) + " |")
+    return "\n".join(lineas) + "\n"
+
+# comparar con una linea base: mas lento (por encima de la tolerancia y del ruido), peor objetivo,
+# o fallo donde antes se resolvia; devuelve la lista de regresiones como texto
+def comparar(resultados, base, tolerancia=TOLERANCIA):
+    anteriores = {(registro["instancia"], registro["camino"]): registro for registro in base["resultados"]}
+    regresiones = []
+    for registro in resultados: # cada resultado con su equivalente de la linea base
+        anterior = anteriores.get((registro["instancia"], registro["camino"]))
+        if anterior is None:
+            continue
+        nombre = f"{registro['instancia']} {registro['camino']}"
+        if anterior["codigo"] == 0 and registro["codigo"] != 0:
+            regresiones.append(f"{nombre}: {anterior['estado']} -> {registro['estado']}")
+        elif registro["objetivo"] is not None and anterior["objetivo"] is not None and \
+                registro["objetivo"] > anterior["objetivo"] + 1e-6 * max(1.0, abs(anterior["objetivo"])):
+            regresiones.append(f"{nombre}: objetivo {anterior['objetivo']:.2f} -> {registro['objetivo']:.2f}")
+        if registro["real_s"] > anterior["real_s"] * (1 + tolerancia) and registro["real_s"] - anterior["real_s"] > MINIMO_S:
+            regresiones.append(f"{nombre}: tiempo {anterior['real_s']:.3f} s -> {registro['real_s']:.3f} s")
+    return regresiones
+
+# funcion principal
+def main():
+    parser = Argumentos(USAGE)
+    parser.add_argument("entrada") # directorio o patron de .in
+    parser.add_argument("--caminos", nargs="+", choices=list(CAMINOS), default=list(CAMINOS)) # caminos a medir
+    parser.add_argument("--repeticiones", type=int, default=1) # ejecuciones por camino, se toma la mediana
+    parser.add_argument("--limite", type=float, default=LIMITE) # segundos maximos por ejecucion
+    parser.add_argument("--tabla", default=None) # fichero de la tabla (por defecto stdout)
+    parser.add_argument("--linea-base", default=None) # escribir la linea base en este fichero
+    parser.add_argument("--comparar", default=None) # linea base con la que comparar
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA) # aumento relativo de tiempo tolerado
+    args = parser.parse_args()
+
+    instancias = lote.buscar_instancias(args.entrada)
+    if not instancias: # si no hay ningun .in --> error
+        print(f"Error: no hay ficheros .in en: {args.entrada}", file=sys.stderr)
+        sys.exit(2)
+
+    resultados = medir(instancias, args.caminos, max(1, args.repeticiones), args.limite)
+    texto = tabla(resultados)
+    if args.tabla:
+        Path(args.tabla).write_text(texto, encoding="utf-8")
+    else:
+        print(texto, end="")
+    if args.linea_base: # resultados con el entorno en el que se midieron
+        base = {"python": platform.python_version(), "maquina": platform.machine(), "resultados": resultados}
+        Path(args.linea_base).write_text(json.dumps(base, ensure_ascii=False, indent=1) + "\n", encoding="utf-8")
+    if args.comparar:
+        regresiones = comparar(resultados, json.loads(Path(args.comparar).read_text(encoding="utf-8")), args.tolerancia)
+        for regresion in regresiones: # cada regresion detectada
+            print(f"REGRESION {regresion}", file=sys.stderr)
+        if regresiones: # alguna regresion --> codigo de salida propio
+            sys.exit(10)
+
+if __name__ == "__main__":
+    main()
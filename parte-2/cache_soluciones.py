@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# cache en disco de resultados, direccionada por contenido: la clave es el hash de los datos
+# ya parseados de la instancia, del .mod y de las opciones del resolutor, asi que el mismo .in
+# resuelto otra vez (reintentos, reejecuciones) devuelve el resultado guardado sin llamar a glpsol
+
+import os, json, time, hashlib, threading
+from pathlib import Path
+
+# directorio por defecto, se puede cambiar con la variable de entorno PL_CACHE_DIR
+DIR_CACHE = Path(os.environ.get("PL_CACHE_DIR") or
+                 Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "programacion-lineal-heuristica")
+# limites de la cache: tamaño total y antiguedad (desde el ultimo uso)
+MAX_MB = 256
+MAX_DIAS = 30
+# la expulsion recorre todo el directorio: como mucho una vez cada LIMPIEZA_S segundos (entre todos los
+# procesos, con la fecha de un fichero marca) o cada LIMPIEZA_ESCRITURAS escrituras del mismo proceso
+LIMPIEZA_S = 60
+LIMPIEZA_ESCRITURAS = 256
+MARCA = ".limpieza"
+
+# configuracion de la cache de una ejecucion
+class Cache:
+    def __init__(self, directorio=DIR_CACHE, refrescar=False, max_mb=MAX_MB, max_dias=MAX_DIAS):
+        self.directorio = Path(directorio)
+        self.refrescar = refrescar # True --> no se leen entradas, solo se sobrescriben
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.max_segundos = max_dias * 86400
+        self.escrituras = 0 # escrituras desde la ultima limpieza de este proceso
+
+    # ruta de la entrada de una clave
+    def _ruta(self, clave):
+        return self.directorio / f"{clave}.json"
+
+    # resultado guardado para la clave o None; cada acierto renueva la fecha de uso (LRU)
+    def leer(self, clave):
+        if self.refrescar:
+            return None
+        ruta = self._ruta(clave)
+        try:
+            with ruta.open("r", encoding="utf-8") as fichero:
+                resultado = json.load(fichero)
+            os.utime(ruta)
+        except (OSError, ValueError): # no existe, esta corrupta o la borro otro proceso
+            return None
+        return resultado
+
+    # guardar un resultado y, de vez en cuando, aplicar la politica de expulsion
+    def guardar(self, clave, resultado):
+        try:
+            self.directorio.mkdir(parents=True, exist_ok=True)
+            ruta = self._ruta(clave)
+            temporal = ruta.with_name(f"{ruta.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+            temporal.write_text(json.dumps(resultado, ensure_ascii=False), encoding="utf-8")
+            temporal.replace(ruta) # escritura atomica, varios procesos (o hilos) pueden compartir la cache
+            self.escrituras += 1
+            if self._toca_limpiar():
+                self.limpiar()
+        except OSError: # si no se puede escribir la cache --> se sigue sin ella
+            pass
+
+    # True si hace falta limpiar: muchas escrituras propias o la ultima limpieza (de cualquier
+    # proceso) es antigua; entre limpiezas la cache puede pasarse un poco del tamaño maximo
+    def _toca_limpiar(self):
+        if self.escrituras >= LIMPIEZA_ESCRITURAS:
+            return True
+        try:
+            return time.time() - (self.directorio / MARCA).stat().st_mtime > LIMPIEZA_S
+        except OSError: # sin marca --> nunca se ha limpiado
+            return True
+
+    # expulsar entradas sin usar desde hace mas de max_dias y, si aun se supera el tamaño
+    # maximo, las menos usadas recientemente
+    def limpiar(self):
+        self.escrituras = 0
+        (self.directorio / MARCA).touch() # los demas procesos no limpian hasta dentro de LIMPIEZA_S
+        ahora = time.time()
+        entradas = []
+        for ruta in self.directorio.glob("*.json"): # cada entrada de la cache
+            try:
+                estado = ruta.stat()
+            except OSError:
+                continue
+            if ahora - estado.st_mtime > self.max_segundos: # demasiado antigua --> fuera
+                ruta.unlink(missing_ok=True)
+            else:
+                entradas.append((estado.st_mtime, estado.st_size, ruta))
+        total = sum(tamano for _, tamano, _ in entradas)
+        for _, tamano, ruta in sorted(entradas): # de la menos a la mas reciente
+            if total <= self.max_bytes:
+                break
+            ruta.unlink(missing_ok=True)
+            total -= tamano
+
+# clave de cache: sha256 de la huella de los datos, del contenido del .mod (si lo hay) y de las opciones
+def clave(huella_datos, mod_path, opciones):
+    h = hashlib.sha256()
+    h.update(huella_datos.encode("ascii"))
+    h.update(b"\0")
+    if mod_path is not None:
+        h.update(Path(mod_path).read_bytes())
+    h.update(b"\0")
+    h.update(json.dumps(opciones, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+# opciones de linea de comandos de la cache, comunes a gen-1.py y gen-2.py
+def anadir_argumentos(parser):
+    parser.add_argument("--sin-cache", action="store_true") # no leer ni escribir la cache
+    parser.add_argument("--refrescar-cache", action="store_true") # resolver siempre y sobrescribir la entrada
+    parser.add_argument("--dir-cache", default=DIR_CACHE) # directorio de la cache
+    parser.add_argument("--cache-max-mb", type=float, default=MAX_MB) # tamaño maximo de la cache
+    parser.add_argument("--cache-max-dias", type=float, default=MAX_DIAS) # antiguedad maxima de una entrada
+
+# cache configurada segun los argumentos, o None con --sin-cache
+def desde_argumentos(args):
+    if args.sin_cache:
+        return None
+    return Cache(args.dir_cache, args.refrescar_cache, args.cache_max_mb, args.cache_max_dias)
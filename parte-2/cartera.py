@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+# cartera de resolutores (gen-2.py --cartera): varios glpsol con distintas opciones y la heuristica
+# compiten a la vez sobre la misma instancia. Gana el primero que demuestra el optimo (o la
+# infactibilidad); con limite de tiempo, si nadie lo demuestra, la mejor solucion factible. Los
+# demas se matan. Las cotas que publica cualquier glpsol sirven para demostrar optima la heuristica
+
+import time, asyncio, multiprocessing
+
+import glpsol_vivo
+import solucion_glpk
+
+# configuraciones de glpsol: nombre -> opciones
+CONFIGURACIONES = {
+    "defecto": [],
+    "cortes": ["--cuts"], # cortes MIR, Gomory, de cubrimiento y de cliques
+    "fpump": ["--fpump"], # feasibility pump para encontrar pronto una incumbente
+    "proxy": ["--proxy"], # busqueda por proximidad a partir de la incumbente
+    "pcost": ["--pcost"], # ramificacion por pseudocostes
+    "dfs": ["--dfs"], # exploracion en profundidad
+    "bfs": ["--bfs"], # exploracion en anchura
+    "sin-presolve": ["--nopresol"], # sin preproceso del LP
+    "cortes-pcost": ["--cuts", "--pcost"],
+}
+# cartera por defecto
+CARTERA = ("defecto", "cortes", "fpump", "pcost", "dfs")
+# estados que cierran la carrera: optimo demostrado o infactibilidad demostrada
+DEFINITIVOS = ("INTEGER OPTIMAL", "INTEGER EMPTY")
+TOLERANCIA = 1e-6
+
+# resultado de un participante: (configuracion, estado, objetivo, solucion, salida de glpsol)
+# solucion es la ruta del fichero de glpsol o la solucion devuelta por la heuristica
+
+# un glpsol de la carrera con su propio fichero de solucion
+async def _glpsol(nombre, orden, sol_path, limite, al_progresar):
+    codigo, salida, _, parado = await glpsol_vivo.ejecutar_async(orden, limite, al_progresar)
+    if parado or codigo != 0: # se ha pasado del limite o ha fallado --> no aporta solucion
+        return nombre, "ERROR", None, None, salida
+    try: # basta la cabecera para saber el estado y el objetivo
+        estado, objetivo, _, _, _ = solucion_glpk.leer_mip(sol_path, 0)
+    except (OSError, ValueError):
+        return nombre, "ERROR", None, None, salida
+    if estado not in ("INTEGER OPTIMAL", "INTEGER NON-OPTIMAL"): # sin solucion entera
+        objetivo = None
+    return nombre, estado, objetivo, sol_path, salida
+
+def _proceso_heuristica(heuristica, conexion):
+    conexion.send(heuristica())
+    conexion.close()
+
+# la heuristica en un proceso aparte (se puede matar, a diferencia de un hilo)
+# heuristica() devuelve (valor, solucion) o None si la instancia no tiene solucion
+async def _heuristica(heuristica):
+    recibir, enviar = multiprocessing.Pipe(duplex=False)
+    proceso = multiprocessing.Process(target=_proceso_heuristica, args=(heuristica, enviar), daemon=True)
+    proceso.start()
+    enviar.close()
+    try:
+        solucion = await asyncio.get_running_loop().run_in_executor(None, recibir.recv)
+    except EOFError: # el proceso ha muerto sin responder
+        return "heuristica", "ERROR", None, None, ""
+    except asyncio.CancelledError: # ya no hace falta --> se mata (y recv termina con EOFError)
+        proceso.kill()
+        raise
+    finally:
+        proceso.join()
+        recibir.close()
+    if solucion is None: # no hay huecos para todos los buses --> infactible
+        return "heuristica", "INTEGER EMPTY", None, None, ""
+    return "heuristica", "HEURISTICA", solucion[0], solucion, ""
+
+async def _correr(ordenes, heuristica, limite, cota, al_progresar):
+    cotas = [cota] # mejor cota inferior conocida (todos los modelos minimizan)
+    heuristico = [] # resultado de la heuristica en cuanto termina
+    probada = asyncio.Event() # la heuristica alcanza la cota --> es optima
+
+    def comprobar():
+        if heuristico and cotas[0] is not None and heuristico[0][2] <= cotas[0] + TOLERANCIA * max(1.0, abs(cotas[0])):
+            probada.set()
+
+    def progresar(nombre): # avisos de cada glpsol, con su configuracion
+        def avisar(evento):
+            if evento["cota"] is not None and (cotas[0] is None or evento["cota"] > cotas[0]):
+                cotas[0] = evento["cota"]
+                comprobar()
+            if al_progresar is not None:
+                al_progresar(dict(evento, configuracion=nombre))
+        return avisar
+
+    tareas = [asyncio.create_task(_glpsol(nombre, orden, sol_path, limite, progresar(nombre)))
+              for nombre, (orden, sol_path) in ordenes.items()]
+    if heuristica is not None:
+        tareas.append(asyncio.create_task(_heuristica(heuristica)))
+    espera = asyncio.create_task(probada.wait())
+    pendientes = set(tareas)
+    terminados = []
+    try:
+        while pendientes and not probada.is_set(): # hasta que alguien gane o terminen todos
+            hechas, _ = await asyncio.wait(pendientes | {espera}, return_when=asyncio.FIRST_COMPLETED)
+            for tarea in hechas - {espera}: # cada participante que ha terminado
+                pendientes.discard(tarea)
+                resultado = tarea.result()
+                if resultado[1] in DEFINITIVOS:
+                    return resultado
+                terminados.append(resultado)
+                if resultado[0] == "heuristica" and resultado[2] is not None:
+                    heuristico.append(resultado)
+                    comprobar()
+    finally: # matar a los que siguen
+        for tarea in tareas + [espera]:
+            tarea.cancel()
+        await asyncio.gather(*tareas, espera, return_exceptions=True)
+
+    if probada.is_set(): # la heuristica ha alcanzado la cota de glpsol
+        return ("heuristica", "INTEGER OPTIMAL") + heuristico[0][2:]
+    factibles = [resultado for resultado in terminados if resultado[2] is not None]
+    return min(factibles, key=lambda resultado: resultado[2]) if factibles else None
+
+# lanzar la carrera: ordenes {configuracion: (orden de glpsol, ruta de su solucion)}, heuristica una
+# funcion sin argumentos (se ejecuta en otro proceso), limite en segundos (ya incluido en las ordenes
+# con --tmlim), cota inferior conocida de antemano y al_progresar(evento) para seguir a cada glpsol
+# devuelve (configuracion, estado, objetivo, solucion, salida, segundos) del ganador, o None si
+# ningun participante ha encontrado solucion
+def correr(ordenes, heuristica=None, limite=None, cota=None, al_progresar=None):
+    inicio = time.perf_counter()
+    ganador = asyncio.run(_correr(ordenes, heuristica, limite, cota, al_progresar))
+    return None if ganador is None else ganador + (time.perf_counter() - inicio,)
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+# piezas comunes de los programas de linea de comandos (gen-1.py, gen-2.py, benchmark.py, generador.py,
+# planificador.py) y de los modulos de resolucion (parte_2_1.py, parte_2_2.py)
+
+import sys, argparse
+
+# error de resolucion, guarda el codigo de salida del programa
+class ErrorSolucion(Exception):
+    def __init__(self, mensaje, codigo):
+        super().__init__(mensaje)
+        self.codigo = codigo
+
+# parser de argumentos que mantiene el mensaje de uso de cada programa y el codigo de salida 1
+class Argumentos(argparse.ArgumentParser):
+    def __init__(self, uso, **opciones):
+        super().__init__(add_help=False, **opciones)
+        self.uso = uso
+
+    def error(self, message):
+        print(self.uso, file=sys.stderr)
+        sys.exit(1)
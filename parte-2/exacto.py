@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+# resolucion exacta en proceso del modelo de varios talleres (parte-2-2, gen-2.py --exacto)
+# quitando la capacidad, el problema es repartir los buses en franjas minimizando el peso de los pares
+# que coinciden; el taller concreto dentro de la franja no cambia el coste. Branch and bound en
+# profundidad, bus a bus (los de mas peso primero), con:
+#   - incumbente inicial de la heuristica (recocido simulado) para podar desde el primer nodo
+#   - cota inferior combinatoria: coste ya fijado + para cada bus sin colocar su carga mas barata con
+#     los buses ya colocados (franjas con hueco) + los pares que la capacidad obliga a juntar entre los
+#     buses sin colocar, como minimo los mas baratos de entre ellos (un arbol de Fenwick sobre los pares
+#     con peso ordenados, del que se quitan los de cada bus al colocarlo: memoria O(pares con peso))
+#   - ruptura de simetria: franjas vacias con la misma capacidad son intercambiables, solo se prueba una
+# los buses sin pasajeros comunes con nadie no cuestan nada: se colocan al final en los huecos que queden
+
+import time
+
+import heuristica
+
+TOLERANCIA = 1e-9
+NODOS_RELOJ = 64 # cada cuantos nodos se mira el reloj con limite de tiempo (un nodo es O(buses * franjas))
+
+# pares minimos que hay que juntar al repartir n buses en franjas con huecos libres: el reparto mas
+# equilibrado posible, llenando por niveles (una franja con k buses junta k*(k-1)/2 pares)
+def pares_forzados(n, libres):
+    pares = 0
+    nivel = 0
+    abiertas = sorted(libres)
+    while n > 0:
+        abiertas = [r for r in abiertas if r > nivel] # franjas que admiten un bus mas en este nivel
+        if not abiertas: # no caben --> no deberia ocurrir si la instancia es factible
+            return float("inf")
+        tomados = min(n, len(abiertas))
+        pares += tomados * nivel # cada bus nuevo coincide con los nivel buses que ya hay en su franja
+        n -= tomados
+        nivel += 1
+    return pares
+
+# pares con peso de los buses sin colocar, para sumar los k mas baratos en O(log pares): arbol de
+# Fenwick de cuantos y cuanto pesan, indexado por la posicion de cada par en el orden de pesos
+class ParesVivos:
+    def __init__(self, pesos_ordenados):
+        self.tamano = len(pesos_ordenados)
+        self.cuantos = [0] * (self.tamano + 1)
+        self.suma = [0.0] * (self.tamano + 1)
+        for i, peso in enumerate(pesos_ordenados, start=1): # construccion en O(pares): todos vivos
+            self.cuantos[i] += 1
+            self.suma[i] += peso
+            j = i + (i & -i)
+            if j <= self.tamano:
+                self.cuantos[j] += self.cuantos[i]
+                self.suma[j] += self.suma[i]
+        self.vivos = self.tamano
+        self.paso = 1 << self.tamano.bit_length()
+
+    # quitar (signo -1) o volver a poner (+1) el par de la posicion i (0-indexada) con su peso
+    def cambiar(self, i, peso, signo):
+        self.vivos += signo
+        i += 1
+        while i <= self.tamano:
+            self.cuantos[i] += signo
+            self.suma[i] += signo * peso
+            i += i & -i
+
+    # suma de los k pares vivos mas baratos (k <= vivos): descenso por el arbol
+    def mas_baratos(self, k):
+        posicion, total = 0, 0.0
+        paso = self.paso
+        while paso:
+            if posicion + paso <= self.tamano and self.cuantos[posicion + paso] <= k:
+                posicion += paso
+                k -= self.cuantos[posicion]
+                total += self.suma[posicion]
+            paso >>= 1
+        return total
+
+# busqueda del optimo; tiempo_limite en segundos (None = sin limite) contados desde inicio
+# (perf_counter, por defecto al crear la busqueda)
+class BranchAndBound:
+    def __init__(self, pesos, franjas, disponibilidad, tiempo_limite=None, inicio=None):
+        self.inicio = time.perf_counter() if inicio is None else inicio
+        self.pesos = pesos
+        self.franjas = franjas
+        self.capacidad = [sum(disponibilidad[f]) for f in range(franjas)]
+        self.tiempo_limite = tiempo_limite
+        buses = len(pesos)
+        # buses con algun peso, los de mas peso primero; vecinos con peso de cada bus (matriz dispersa)
+        self.orden = sorted((a for a in range(buses) if any(pesos[a])), key=lambda a: -sum(pesos[a]))
+        self.vecinos = [[(b, peso) for b, peso in enumerate(pesos[a]) if peso] for a in range(buses)]
+        # pares con peso entre buses de orden, en orden de peso; cada bus guarda los suyos con los buses
+        # que van despues (al colocarlo dejan de estar entre los sin colocar)
+        posicion = {a: d for d, a in enumerate(self.orden)}
+        pares = sorted((peso, posicion[a], posicion[b]) for a in self.orden for b, peso in self.vecinos[a] if posicion[a] < posicion[b])
+        self.pares_de = [[] for _ in self.orden]
+        for i, (peso, d, _) in enumerate(pares):
+            self.pares_de[d].append((i, peso))
+        self.pares_vivos = ParesVivos([peso for peso, _, _ in pares])
+        # estado: franja de cada bus, buses y huecos libres por franja, carga[a][f] = pesos con los buses de f
+        self.franja_de = [-1] * buses
+        self.ocupados = [0] * franjas
+        self.libres = list(self.capacidad)
+        self.carga = [[0.0] * franjas for _ in range(buses)]
+        self.mejor = float("inf")
+        self.mejor_franjas = None
+        self.nodos = 0
+        self.parado = False
+
+    # cota de los pares entre los buses sin colocar desde la profundidad d (con los pares de los buses
+    # anteriores ya quitados de pares_vivos); los pares sin peso son los mas baratos
+    def _cota_pares(self, d):
+        n = len(self.orden) - d
+        pares = pares_forzados(n, [r for r in self.libres if r > 0])
+        if pares > n * (n - 1) // 2:
+            return float("inf")
+        return self.pares_vivos.mas_baratos(max(0, pares - (n * (n - 1) // 2 - self.pares_vivos.vivos)))
+
+    # quitar (signo -1) o volver a poner (+1) los pares del bus de la profundidad d con los siguientes
+    def _retirar_pares(self, d, signo):
+        for i, peso in self.pares_de[d]:
+            self.pares_vivos.cambiar(i, peso, signo)
+
+    # cota de la carga con los ya colocados de cada bus sin colocar desde la profundidad d
+    def _cota_cargas(self, d):
+        abiertas = [f for f in range(self.franjas) if self.libres[f] > 0]
+        return sum(min(self.carga[a][f] for f in abiertas) for a in self.orden[d:])
+
+    def _colocar(self, a, f, signo):
+        for b, peso in self.vecinos[a]:
+            self.carga[b][f] += signo * peso
+        self.ocupados[f] += signo
+        self.libres[f] -= signo
+        self.franja_de[a] = f if signo > 0 else -1
+
+    def _explorar(self, d, coste):
+        self.nodos += 1
+        if self.tiempo_limite is not None and self.nodos % NODOS_RELOJ == 0 \
+                and time.perf_counter() - self.inicio > self.tiempo_limite:
+            self.parado = True
+        if self.parado:
+            return
+        if d == len(self.orden): # todos los buses con peso colocados --> nueva incumbente
+            self.mejor = coste
+            self.mejor_franjas = list(self.franja_de)
+            return
+        a = self.orden[d]
+        cargas = self._cota_cargas(d + 1)
+        if coste + self.carga[a][min((f for f in range(self.franjas) if self.libres[f] > 0), key=self.carga[a].__getitem__)] \
+                + cargas + self._cota_pares(d) >= self.mejor - TOLERANCIA: # cota del nodo --> podar
+            return
+        # franjas candidatas: con hueco, y de las vacias solo la primera de cada capacidad (simetria)
+        candidatas = []
+        vistas = set()
+        for f in range(self.franjas):
+            if self.libres[f] == 0:
+                continue
+            if self.ocupados[f] == 0:
+                if self.capacidad[f] in vistas:
+                    continue
+                vistas.add(self.capacidad[f])
+            candidatas.append(f)
+        candidatas.sort(key=self.carga[a].__getitem__) # primero la mas barata
+        self._retirar_pares(d, -1) # a deja de estar entre los sin colocar
+        for f in candidatas: # cada rama
+            nuevo = coste + self.carga[a][f]
+            if nuevo + cargas >= self.mejor - TOLERANCIA: # las siguientes son mas caras --> podar el resto
+                break
+            self._colocar(a, f, 1)
+            if nuevo + cargas + self._cota_pares(d + 1) < self.mejor - TOLERANCIA:
+                self._explorar(d + 1, nuevo)
+            self._colocar(a, f, -1)
+            if self.parado:
+                break
+        self._retirar_pares(d, 1)
+
+    # buscar a partir de una incumbente (franja de cada bus, 0-indexada, y su coste)
+    # devuelve True si se ha demostrado el optimo, False si se ha agotado el tiempo
+    def resolver(self, incumbente=None, coste=float("inf")):
+        if incumbente is not None:
+            self.mejor = coste
+            self.mejor_franjas = list(incumbente)
+        self.cota = self._cota_pares(0) # cota inferior de la raiz (la carga con los colocados es 0)
+        if self.mejor > self.cota + TOLERANCIA: # la incumbente puede no ser optima --> buscar
+            if self.tiempo_limite is not None and time.perf_counter() - self.inicio > self.tiempo_limite:
+                self.parado = True # el limite se ha ido en la heuristica y la preparacion
+            else:
+                self._explorar(0, 0.0)
+        return not self.parado
+
+# fraccion del limite de tiempo para la heuristica que da la incumbente inicial
+FRACCION_HEURISTICA = 0.25
+
+# resolver una instancia; devuelve (valor, asignaciones (bus, franja, taller) 1-indexadas, optimo
+# demostrado, cota inferior de la raiz, nodos explorados) o None si no hay huecos para todos los buses
+# el limite de tiempo cuenta desde aqui: heuristica, preparacion y busqueda
+def resolver(suma_pasajeros, franjas, disponibilidad, tiempo_limite=None, semilla=0):
+    inicio = time.perf_counter()
+    buses = len(suma_pasajeros)
+    if sum(map(sum, disponibilidad)) < buses: # si no hay huecos suficientes --> infactible
+        return None
+    pesos = heuristica.pesos_coincidencia(suma_pasajeros, buses)
+    # incumbente inicial de la heuristica con su presupuesto por defecto (sin limite el resultado nunca
+    # es peor que el de --heuristica con la misma semilla); con limite, como mucho una parte de el
+    tiempo_heuristica = None if tiempo_limite is None else FRACCION_HEURISTICA * tiempo_limite
+    valor, asignaciones, _ = heuristica.recocido_simulado(suma_pasajeros, franjas, disponibilidad,
+                                                          heuristica.ITERACIONES, tiempo_heuristica, semilla, pesos)
+    incumbente = [-1] * buses
+    for a, f, _ in asignaciones:
+        incumbente[a - 1] = f - 1
+
+    busqueda = BranchAndBound(pesos, franjas, disponibilidad, tiempo_limite, inicio)
+    optimo = busqueda.resolver(incumbente, valor)
+    if busqueda.mejor >= valor - TOLERANCIA: # la busqueda no ha mejorado la heuristica
+        return valor, asignaciones, optimo, busqueda.cota, busqueda.nodos
+
+    # talleres: los huecos libres de cada franja en orden; despues los buses sin peso en los que queden
+    huecos = [[t for t, libre in enumerate(disponibilidad[f]) if libre] for f in range(franjas)]
+    asignaciones = []
+    for a in busqueda.orden: # buses con peso, en su franja
+        f = busqueda.mejor_franjas[a]
+        asignaciones.append((a + 1, f + 1, huecos[f].pop(0) + 1))
+    restantes = [(f, t) for f in range(franjas) for t in huecos[f]]
+    colocados = set(busqueda.orden)
+    for a in range(buses): # buses sin peso, en cualquier hueco
+        if a not in colocados:
+            f, t = restantes.pop(0)
+            asignaciones.append((a + 1, f + 1, t + 1))
+    valor = heuristica.coste_asignacion(pesos, [f - 1 for _, f, _ in sorted(asignaciones)])
+    return valor, sorted(asignaciones), optimo, busqueda.cota, busqueda.nodos
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# generador de instancias sinteticas reproducibles (misma semilla --> mismo .in) en los dos
+# formatos de entrada, para barridos de tamaño con benchmark.py:
+#   parte 2.1 (gen-1.py): n franjas, m autobuses, kd kp, distancias y pasajeros
+#   parte 2.2 (gen-2.py): n franjas, m autobuses, u talleres, matriz de pasajeros comunes con una
+#                         densidad de pares no nulos y disponibilidad con una proporcion de huecos libres
+
+import sys, random, itertools
+from pathlib import Path
+
+from comun import Argumentos
+
+USAGE = ("Uso: python generador.py 1 <directorio> --franjas N.. --buses M.. [--semilla S..]\n"
+         "     python generador.py 2 <directorio> --franjas N.. --buses M.. --talleres U.. "
+         "[--densidad D..] [--disponibilidad R..] [--semilla S..]")
+
+# texto de una instancia de la parte 2.1
+def instancia_1(franjas, buses, semilla):
+    aleatorio = random.Random(semilla)
+    coste_distancia, coste_pasajeros = aleatorio.randint(1, 10), aleatorio.randint(1, 10)
+    distancias = [aleatorio.randint(1, 100) for _ in range(buses)]
+    pasajeros = [aleatorio.randint(1, 200) for _ in range(buses)]
+    return (f"{franjas} {buses}\n{coste_distancia} {coste_pasajeros}\n"
+            + " ".join(map(str, distancias)) + "\n" + " ".join(map(str, pasajeros)) + "\n")
+
+# texto de una instancia de la parte 2.2
+# densidad: proporcion de pares (a,b) con pasajeros comunes; disponibilidad: proporcion de huecos libres
+# si hay menos huecos libres que autobuses se abren huecos al azar hasta que la instancia sea factible
+def instancia_2(franjas, buses, talleres, densidad, disponibilidad, semilla):
+    aleatorio = random.Random(semilla)
+    suma = [[0] * buses for _ in range(buses)]
+    for a, b in itertools.combinations(range(buses), 2): # cada par, matriz simetrica con diagonal 0
+        if aleatorio.random() < densidad:
+            suma[a][b] = suma[b][a] = aleatorio.randint(1, 100)
+    huecos = [[1 if aleatorio.random() < disponibilidad else 0 for _ in range(talleres)] for _ in range(franjas)]
+    ocupados = [(f, t) for f in range(franjas) for t in range(talleres) if not huecos[f][t]]
+    aleatorio.shuffle(ocupados)
+    libres = franjas * talleres - len(ocupados)
+    while libres < buses and ocupados: # asegurar un hueco por autobus
+        f, t = ocupados.pop()
+        huecos[f][t] = 1
+        libres += 1
+    return (f"{franjas} {buses} {talleres}\n"
+            + "".join(" ".join(map(str, fila)) + "\n" for fila in suma)
+            + "".join(" ".join(map(str, fila)) + "\n" for fila in huecos))
+
+# escribir el barrido completo (producto cartesiano de los parametros), devuelve las rutas escritas
+# el nombre del fichero lleva los parametros, p.ej. 2-n4-m10-u2-d0.5-r0.8-s0.in
+def generar(parte, directorio, franjas, buses, semillas, talleres=(), densidades=(1.0,), disponibilidades=(1.0,)):
+    directorio.mkdir(parents=True, exist_ok=True)
+    rutas = []
+    if parte == 1:
+        for n, m, s in itertools.product(franjas, buses, semillas): # cada combinacion
+            ruta = directorio / f"1-n{n}-m{m}-s{s}.in"
+            ruta.write_text(instancia_1(n, m, s), encoding="utf-8")
+            rutas.append(ruta)
+    else:
+        for n, m, u, d, r, s in itertools.product(franjas, buses, talleres, densidades, disponibilidades, semillas):
+            ruta = directorio / f"2-n{n}-m{m}-u{u}-d{d:g}-r{r:g}-s{s}.in"
+            ruta.write_text(instancia_2(n, m, u, d, r, s), encoding="utf-8")
+            rutas.append(ruta)
+    return rutas
+
+# funcion principal
+def main():
+    parser = Argumentos(USAGE)
+    parser.add_argument("parte", type=int, choices=(1, 2)) # formato: 1 (gen-1.py) o 2 (gen-2.py)
+    parser.add_argument("directorio") # donde se escriben los .in
+    parser.add_argument("--franjas", type=int, nargs="+", required=True) # valores de n
+    parser.add_argument("--buses", type=int, nargs="+", required=True) # valores de m
+    parser.add_argument("--talleres", type=int, nargs="+", default=[]) # valores de u (parte 2)
+    parser.add_argument("--densidad", type=float, nargs="+", default=[1.0]) # densidad de la matriz (parte 2)
+    parser.add_argument("--disponibilidad", type=float, nargs="+", default=[1.0]) # proporcion de huecos libres (parte 2)
+    parser.add_argument("--semilla", type=int, nargs="+", default=[0]) # semillas
+    args = parser.parse_args()
+    if args.parte == 2 and not args.talleres: # la parte 2.2 necesita talleres
+        parser.error("--talleres")
+
+    rutas = generar(args.parte, Path(args.directorio), args.franjas, args.buses, args.semilla,
+                    args.talleres, args.densidad, args.disponibilidad)
+    print(f"{len(rutas)} instancias escritas en {args.directorio}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+# ejecucion de glpsol leyendo su salida en vivo (subproceso asyncio): cada linea del branch and
+# bound se convierte en un evento en cuanto glpsol la escribe, p.ej.
+#   +   867: >>>>>   3.020000000e+02 >=   0.000000000e+00 100.0% (45; 0)     nueva incumbente
+#   +  4170: mip =   1.850000000e+02 >=   0.000000000e+00 100.0% (244; 35)   progreso periodico
+# con --tmlim glpsol para al agotar el tiempo y escribe la mejor solucion entera encontrada
+
+import re, time, asyncio
+
+# lineas del branch and bound: iteracion, tipo, incumbente, cota, gap y nodos (activos; resueltos)
+RE_BNB = re.compile(r"^\+\s*(\d+): (>>>>>|mip =)\s+(not found yet|\S+)\s+>=\s+(tree is empty|-inf|\S+)\s+(?:([\d.]+)%\s+)?\((\d+); (\d+)\)")
+GRACIA = 5.0 # segundos de margen sobre el limite (generar el modelo no cuenta en --tmlim)
+
+# evento a partir de una linea de glpsol, o None si la linea no es del branch and bound
+def evento(linea, inicio):
+    coincidencia = RE_BNB.match(linea)
+    if coincidencia is None:
+        return None
+    iteracion, tipo, incumbente, cota, gap, activos, resueltos = coincidencia.groups()
+    return {
+        "evento": "incumbente" if tipo == ">>>>>" else "progreso",
+        "objetivo": None if incumbente == "not found yet" else float(incumbente),
+        "cota": None if cota in ("tree is empty", "-inf") else float(cota),
+        "gap_pct": None if gap is None else float(gap),
+        "iteraciones": int(iteracion),
+        "nodos_activos": int(activos),
+        "nodos_resueltos": int(resueltos),
+        "tiempo_s": round(time.perf_counter() - inicio, 3),
+    }
+
+# leer la salida linea a linea y avisar de cada evento
+async def _leer(proceso, inicio, al_progresar, lineas, eventos):
+    async for linea in proceso.stdout: # cada linea en cuanto se escribe
+        linea = linea.decode("utf-8", "replace")
+        lineas.append(linea)
+        actual = evento(linea, inicio)
+        if actual is not None:
+            eventos.append(actual)
+            if al_progresar is not None:
+                al_progresar(actual)
+    await proceso.wait()
+
+# version asincrona de ejecutar(), para lanzar varios glpsol a la vez; si se cancela se mata glpsol
+async def ejecutar_async(orden, limite=None, al_progresar=None):
+    inicio = time.perf_counter()
+    lineas, eventos = [], []
+    proceso = await asyncio.create_subprocess_exec(*orden, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL)
+    try:
+        await asyncio.wait_for(_leer(proceso, inicio, al_progresar, lineas, eventos),
+                               None if limite is None else limite + GRACIA)
+        parado = False
+    except asyncio.TimeoutError: # glpsol no ha respetado el limite (p.ej. generando el modelo) --> se mata
+        proceso.kill()
+        await proceso.wait()
+        parado = True
+    except asyncio.CancelledError: # ya no hace falta (p.ej. otro glpsol ha ganado) --> se mata
+        proceso.kill()
+        await proceso.wait()
+        raise
+    return proceso.returncode, "".join(lineas), eventos, parado
+
+# ejecutar glpsol (orden completa, con --tmlim si hay limite) avisando de cada evento con
+# al_progresar(evento); devuelve (codigo de salida, salida estandar, eventos, parado por el limite)
+def ejecutar(orden, limite=None, al_progresar=None):
+    return asyncio.run(ejecutar_async(orden, limite, al_progresar))
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+# heuristica para el modelo de varios talleres (parte-2-2): recocido simulado sobre
+# movimientos bus -> (franja, taller) libre e intercambios de buses entre franjas
+
+import math, random, time
+
+# peso de coincidencia entre a y b (0-indexados): el modelo solo usa suma_pasajeros[a,b] con a < b
+def pesos_coincidencia(suma_pasajeros, buses):
+    pesos = []
+    for a in range(buses): # cada bus a
+        fila = [0.0] * buses
+        for b in range(buses): # cada bus b distinto de a
+            if a < b:
+                fila[b] = suma_pasajeros[a][b]
+            elif b < a:
+                fila[b] = suma_pasajeros[b][a]
+        pesos.append(fila)
+    return pesos
+
+# coste de una asignacion completa: suma de pesos de los pares que coinciden en franja
+def coste_asignacion(pesos, franja_de):
+    buses = len(franja_de)
+    return sum(pesos[a][b] for a in range(buses) for b in range(a + 1, buses) if franja_de[a] == franja_de[b])
+
+# estado de la busqueda: asignacion actual y, para cada bus y franja, la suma de pesos
+# con los buses que ya estan en esa franja (carga), para evaluar cada movimiento en O(1)
+class EstadoAsignacion:
+    def __init__(self, pesos, franjas, disponibilidad):
+        self.pesos = pesos
+        self.buses = len(pesos)
+        self.franjas = franjas
+        # huecos (franja, taller) disponibles y quien los ocupa (-1 libre)
+        self.huecos = [(f, t) for f in range(franjas) for t in range(len(disponibilidad[f])) if disponibilidad[f][t]]
+        self.ocupante = [-1] * len(self.huecos)
+        self.hueco_de = [-1] * self.buses # hueco de cada bus (-1 sin colocar)
+        self.franja_de = [-1] * self.buses # franja de cada bus (-1 sin colocar)
+        # carga[a][f] = sum pesos[a][b] para b colocado en f
+        self.carga = [[0.0] * franjas for _ in range(self.buses)]
+        self.coste = 0.0
+        # huecos libres, con su posicion en la lista para quitarlos en O(1)
+        self.libres = list(range(len(self.huecos)))
+        self.pos_libre = list(range(len(self.huecos)))
+
+    # quitar / poner un hueco en la lista de libres
+    def _ocupar_hueco(self, h):
+        i = self.pos_libre[h]; ultimo = self.libres[-1]
+        self.libres[i] = ultimo; self.pos_libre[ultimo] = i
+        self.libres.pop(); self.pos_libre[h] = -1
+
+    def _liberar_hueco(self, h):
+        self.pos_libre[h] = len(self.libres); self.libres.append(h)
+
+    # actualizar la carga de todos los buses al sumar (signo=1) o quitar (signo=-1) el bus a de la franja f, O(m)
+    def _actualizar_carga(self, a, f, signo):
+        fila = self.pesos[a]
+        for c in range(self.buses):
+            if fila[c]:
+                self.carga[c][f] += signo * fila[c]
+
+    # colocar un bus sin colocar en un hueco libre
+    def colocar(self, a, h):
+        f = self.huecos[h][0]
+        self.coste += self.carga[a][f]
+        self._actualizar_carga(a, f, 1)
+        self._ocupar_hueco(h)
+        self.ocupante[h] = a; self.hueco_de[a] = h; self.franja_de[a] = f
+
+    # retirar un bus de su hueco
+    def retirar(self, a):
+        h = self.hueco_de[a]; f = self.franja_de[a]
+        self._actualizar_carga(a, f, -1)
+        self.coste -= self.carga[a][f]
+        self._liberar_hueco(h)
+        self.ocupante[h] = -1; self.hueco_de[a] = -1; self.franja_de[a] = -1
+
+    # variacion del coste al mover a al hueco libre h
+    def delta_mover(self, a, h):
+        return self.carga[a][self.huecos[h][0]] - self.carga[a][self.franja_de[a]]
+
+    def mover(self, a, h):
+        self.retirar(a)
+        self.colocar(a, h)
+
+    # variacion del coste al intercambiar los huecos de a y b (en franjas distintas)
+    def delta_intercambiar(self, a, b):
+        fa = self.franja_de[a]; fb = self.franja_de[b]
+        if fa == fb:
+            return 0.0
+        peso = self.pesos[a][b]
+        return (self.carga[a][fb] - peso - self.carga[a][fa]) + (self.carga[b][fa] - peso - self.carga[b][fb])
+
+    def intercambiar(self, a, b):
+        ha = self.hueco_de[a]; hb = self.hueco_de[b]
+        self.retirar(a); self.retirar(b)
+        self.colocar(a, hb); self.colocar(b, ha)
+
+    # solucion inicial voraz: buses con mas pasajeros comunes primero, cada uno en la
+    # franja con hueco libre donde menos coincide con los ya colocados
+    def construir_voraz(self):
+        orden = sorted(range(self.buses), key=lambda a: -sum(self.pesos[a]))
+        libres_franja = [[] for _ in range(self.franjas)] # huecos libres por franja
+        for h in self.libres:
+            libres_franja[self.huecos[h][0]].append(h)
+        for a in orden: # cada bus sin colocar
+            if self.hueco_de[a] != -1:
+                continue
+            mejor = min((f for f in range(self.franjas) if libres_franja[f]), key=self.carga[a].__getitem__)
+            self.colocar(a, libres_franja[mejor].pop())
+
+    # asignacion actual como lista de (bus, franja, taller) 1-indexados
+    def asignaciones(self):
+        return [(a + 1, self.huecos[h][0] + 1, self.huecos[h][1] + 1) for a, h in enumerate(self.hueco_de)]
+
+# reparar una asignacion previa ((bus, franja, taller) 1-indexados) tras cambiar la disponibilidad
+# o algunos pesos: los buses cuyo hueco sigue libre se quedan, los demas se recolocan con el voraz
+# y despues solo los afectados (los recolocados y los de afectados, p.ej. con pesos cambiados) se
+# mejoran con movimientos e intercambios de descenso, O(afectados * (huecos + m)) por pasada
+# devuelve (valor, asignaciones, afectados 1-indexados) o None si no hay huecos para todos
+def reparar(suma_pasajeros, franjas, disponibilidad, previas, afectados=(), pesos=None, pasadas=3):
+    buses = len(suma_pasajeros)
+    pesos = pesos or pesos_coincidencia(suma_pasajeros, buses)
+    estado = EstadoAsignacion(pesos, franjas, disponibilidad)
+    if len(estado.huecos) < buses: # si no hay huecos suficientes --> infactible
+        return None
+    indice = {hueco: h for h, hueco in enumerate(estado.huecos)}
+    for a, f, t in previas: # cada bus que sigue teniendo su hueco se queda en el
+        h = indice.get((f - 1, t - 1))
+        if 1 <= a <= buses and h is not None and estado.ocupante[h] == -1 and estado.hueco_de[a - 1] == -1:
+            estado.colocar(a - 1, h)
+    afectados = {a - 1 for a in afectados if 1 <= a <= buses}
+    afectados.update(a for a in range(buses) if estado.hueco_de[a] == -1)
+    estado.construir_voraz() # solo coloca los que se han quedado sin hueco
+
+    for _ in range(pasadas): # descenso sobre los buses afectados
+        mejora = False
+        for a in afectados:
+            # mejor movimiento a un hueco libre y mejor intercambio con otro bus
+            h = min(estado.libres, key=lambda h: estado.delta_mover(a, h), default=None)
+            if h is not None and estado.delta_mover(a, h) < -1e-9:
+                estado.mover(a, h)
+                mejora = True
+            b = min(range(buses), key=lambda b: estado.delta_intercambiar(a, b))
+            if estado.delta_intercambiar(a, b) < -1e-9:
+                estado.intercambiar(a, b)
+                mejora = True
+        if not mejora:
+            break
+
+    valor = coste_asignacion(pesos, estado.franja_de)
+    return valor, estado.asignaciones(), sorted(a + 1 for a in afectados)
+
+# recocido simulado, devuelve (valor, asignaciones, iteraciones) o None si no hay huecos para todos
+# se detiene al llegar a las iteraciones o al tiempo (segundos), lo primero que ocurra;
+# sin ninguno de los dos se hacen ITERACIONES iteraciones
+ITERACIONES = 200000
+
+def recocido_simulado(suma_pasajeros, franjas, disponibilidad, iteraciones=None, tiempo=None, semilla=0, pesos=None):
+    buses = len(suma_pasajeros)
+    pesos = pesos or pesos_coincidencia(suma_pasajeros, buses)
+    estado = EstadoAsignacion(pesos, franjas, disponibilidad)
+    if len(estado.huecos) < buses: # si no hay huecos suficientes --> infactible
+        return None
+    estado.construir_voraz()
+    mejor_coste = estado.coste
+    mejor_huecos = list(estado.hueco_de)
+    if buses < 2 or mejor_coste == 0: # nada que mejorar
+        return mejor_coste, estado.asignaciones(), 0
+
+    if iteraciones is None and tiempo is None:
+        iteraciones = ITERACIONES
+    aleatorio = random.Random(semilla)
+    # temperatura inicial del orden del peso medio de un par, enfriamiento geometrico hasta t0*1e-4
+    # segun la fraccion consumida del presupuesto (iteraciones o tiempo)
+    t0 = max(sum(map(sum, pesos)) / (buses * buses), 1e-9)
+    temperatura = t0
+    inicio = time.perf_counter()
+
+    iteracion = 0
+    while iteraciones is None or iteracion < iteraciones:
+        iteracion += 1
+        if iteracion % 1000 == 0: # cada 1000 iteraciones, recalcular temperatura y mirar el reloj
+            progreso = iteracion / iteraciones if iteraciones else 0.0
+            if tiempo:
+                progreso = max(progreso, (time.perf_counter() - inicio) / tiempo)
+            if progreso >= 1: # si se acaba el presupuesto --> parar
+                break
+            temperatura = t0 * 1e-4 ** progreso
+        a = aleatorio.randrange(buses)
+        if estado.libres and aleatorio.random() < 0.5: # mover a un hueco libre
+            h = estado.libres[aleatorio.randrange(len(estado.libres))]
+            delta = estado.delta_mover(a, h)
+            if delta <= 0 or aleatorio.random() < math.exp(-delta / temperatura):
+                estado.mover(a, h)
+        else: # intercambiar con otro bus
+            b = aleatorio.randrange(buses)
+            delta = estado.delta_intercambiar(a, b)
+            if estado.franja_de[a] != estado.franja_de[b] and (delta <= 0 or aleatorio.random() < math.exp(-delta / temperatura)):
+                estado.intercambiar(a, b)
+        # guardar la mejor solucion vista
+        if estado.coste < mejor_coste - 1e-9:
+            mejor_coste = estado.coste
+            mejor_huecos = list(estado.hueco_de)
+            if mejor_coste <= 0: # no se puede mejorar --> parar
+                break
+
+    asignaciones = [(a + 1, estado.huecos[h][0] + 1, estado.huecos[h][1] + 1) for a, h in enumerate(mejor_huecos)]
+    # recalculamos el coste desde cero para no arrastrar errores de redondeo
+    valor = coste_asignacion(pesos, [estado.huecos[h][0] for h in mejor_huecos])
+    return valor, asignaciones, iteracion
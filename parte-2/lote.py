@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+# modo lote: resolver muchas instancias .in en paralelo y escribir una linea JSON por instancia
+
+import os, glob, json, shutil, tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from multiprocessing.util import Finalize
+from pathlib import Path
+
+# directorio temporal propio de cada proceso del pool
+_dir_trabajo = None
+
+# funcion para buscar los .in a partir de un directorio o de un patron glob
+def buscar_instancias(patron):
+    ruta = Path(patron)
+    if ruta.is_dir(): # si es un directorio --> todos sus .in
+        return sorted(ruta.glob("*.in"))
+    return sorted(Path(p) for p in glob.glob(patron)) # si no --> lo tratamos como patron
+
+# inicializacion de cada proceso: crea su directorio temporal y lo borra al terminar
+def _iniciar_proceso():
+    global _dir_trabajo
+    _dir_trabajo = tempfile.mkdtemp(prefix="lote-")
+    Finalize(None, shutil.rmtree, args=(_dir_trabajo, True), exitpriority=10)
+
+# resolver una instancia dentro de un proceso del pool, nunca lanza excepciones
+def _resolver(resolver, in_path):
+    registro = {"instancia": str(in_path)}
+    try:
+        registro.update(resolver(in_path, _dir_trabajo))
+    except Exception as e: # cualquier error queda en el registro de esa instancia
+        registro["estado"] = "ERROR"
+        registro["error"] = str(e)
+        registro["codigo"] = getattr(e, "codigo", None)
+    return registro
+
+# funcion principal del modo lote
+# resolver(in_path, dir_trabajo) debe devolver un diccionario serializable a JSON
+# devuelve (numero de instancias, numero de instancias con error)
+def resolver_lote(instancias, salida_path, resolver, procesos=None):
+    procesos = procesos or os.cpu_count() or 1
+    # trozos pequeños para repartir bien la carga, pero sin pagar un envio por instancia
+    trozo = max(1, len(instancias) // (procesos * 4))
+    total = errores = 0
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_proceso) as pool, \
+         salida_path.open("w", encoding="utf-8") as salida:
+        # map mantiene el orden de las instancias en el .jsonl
+        for registro in pool.map(_resolver, repeat(resolver), instancias, chunksize=trozo):
+            salida.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            total += 1
+            if registro["estado"] == "ERROR": # contamos las instancias con error
+                errores += 1
+    return total, errores
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+# metricas de una ejecucion (--perfil): tiempo real, tiempo de CPU y memoria maxima de cada fase
+# (lectura del .in, escritura del .dat, glpsol, lectura de la solucion...) y estadisticas de glpsol
+# sacadas de su salida estandar, para poder fijar objetivos de latencia y detectar regresiones
+
+import sys, re, json, time, resource
+from contextlib import contextmanager, nullcontext
+
+# lineas de la salida de glpsol que interesan
+RE_TAMANO = re.compile(r"^(\d+) rows, (\d+) columns, (\d+) non-zeros") # tamaño del problema
+RE_ITERACION = re.compile(r"^[*+ ]\s*(\d+): ") # contador de iteraciones del simplex (acumulado)
+RE_NODOS = re.compile(r"(?:([\d.]+)%\s*)?\((\d+); (\d+)\)\s*$") # gap y nodos (activos; resueltos) del B&B
+RE_TIEMPO = re.compile(r"^Time used:\s*([\d.]+) secs") # solo si glpsol lo imprime
+RE_MEMORIA = re.compile(r"^Memory used:\s*([\d.]+) Mb")
+
+# tiempos de CPU (propio y de los procesos hijos, p.ej. glpsol) y memoria maxima en KB
+def _muestra():
+    propio = resource.getrusage(resource.RUSAGE_SELF)
+    hijos = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return (time.perf_counter(), time.process_time(), hijos.ru_utime + hijos.ru_stime,
+            propio.ru_maxrss, hijos.ru_maxrss)
+
+# metricas recogidas durante una ejecucion
+class Perfil:
+    def __init__(self):
+        self.fases = {} # nombre -> metricas, en orden de ejecucion
+        self.glpsol = {} # estadisticas de la ultima llamada a glpsol
+        self.inicio = time.perf_counter()
+
+    # medir una fase; si una fase se repite se acumulan sus tiempos
+    @contextmanager
+    def fase(self, nombre):
+        real, cpu, cpu_hijos, rss_inicio, rss_hijos_inicio = _muestra()
+        try:
+            yield
+        finally:
+            real_fin, cpu_fin, cpu_hijos_fin, rss, rss_hijos = _muestra()
+            metricas = self.fases.setdefault(nombre, {"real_s": 0.0, "cpu_s": 0.0, "cpu_hijos_s": 0.0})
+            metricas["real_s"] += real_fin - real
+            metricas["cpu_s"] += cpu_fin - cpu
+            metricas["cpu_hijos_s"] += cpu_hijos_fin - cpu_hijos
+            # ru_maxrss es el pico de toda la vida del proceso (KB en Linux), no el de la fase: tras la
+            # fase mas grande todas las siguientes dan el mismo valor. Lo propio de la fase es cuanto
+            # ha subido ese pico mientras duraba (0 si no ha superado el pico anterior)
+            metricas["rss_max_acumulado_kb"] = rss
+            metricas["rss_max_hijos_acumulado_kb"] = rss_hijos
+            metricas["rss_incremento_kb"] = metricas.get("rss_incremento_kb", 0) + rss - rss_inicio
+            metricas["rss_hijos_incremento_kb"] = metricas.get("rss_hijos_incremento_kb", 0) + rss_hijos - rss_hijos_inicio
+
+    # guardar las estadisticas de una ejecucion de glpsol a partir de su salida estandar
+    def anadir_glpsol(self, salida):
+        self.glpsol = estadisticas_glpsol(salida)
+
+    # registro JSON de la ejecucion
+    def registro(self, **datos):
+        return dict(datos, total_s=time.perf_counter() - self.inicio, fases=self.fases, glpsol=self.glpsol)
+
+# contexto de medida de una fase, o nada si no se esta perfilando
+def fase(perfil, nombre):
+    return nullcontext() if perfil is None else perfil.fase(nombre)
+
+# estadisticas de la salida de glpsol: tamaño del problema (original y tras el preproceso),
+# iteraciones del simplex, nodos del branch and bound, gap final y, si aparecen, tiempo y memoria
+def estadisticas_glpsol(salida):
+    estadisticas = {}
+    tamanos = []
+    for linea in salida.splitlines(): # cada linea de la salida
+        if coincidencia := RE_TAMANO.match(linea):
+            tamanos.append(tuple(map(int, coincidencia.groups())))
+        elif coincidencia := RE_ITERACION.match(linea):
+            estadisticas["iteraciones_simplex"] = max(estadisticas.get("iteraciones_simplex", 0), int(coincidencia.group(1)))
+            if linea.startswith("+") and (nodos := RE_NODOS.search(linea)): # linea del B&B
+                gap, activos, resueltos = nodos.groups()
+                estadisticas["nodos_activos"] = int(activos)
+                estadisticas["nodos_resueltos"] = int(resueltos)
+                if gap is not None:
+                    estadisticas["gap_pct"] = float(gap)
+        elif coincidencia := RE_TIEMPO.match(linea):
+            estadisticas["tiempo_s"] = float(coincidencia.group(1))
+        elif coincidencia := RE_MEMORIA.match(linea):
+            estadisticas["memoria_mb"] = float(coincidencia.group(1))
+    if tamanos: # el primero es el problema generado, el ultimo el que resuelve el simplex
+        estadisticas["filas"], estadisticas["columnas"], estadisticas["no_nulos"] = tamanos[0]
+        estadisticas["filas_preproceso"], estadisticas["columnas_preproceso"], estadisticas["no_nulos_preproceso"] = tamanos[-1]
+    return estadisticas
+
+# escribir el registro del perfil en stderr ("-") o en un fichero aparte, una linea JSON
+def emitir(perfil, destino, **datos):
+    if perfil is None: # no se esta perfilando
+        return
+    linea = json.dumps(perfil.registro(**datos), ensure_ascii=False)
+    if destino == "-":
+        print(linea, file=sys.stderr)
+    else:
+        with open(destino, "w", encoding="utf-8") as fichero:
+            fichero.write(linea + "\n")
@@ -0,0 +1,46 @@
+# parte-2-2-agregado.mod — Parte 2.2 agregada por franjas
+
+# el objetivo solo depende de la franja de cada autobus, los talleres solo importan por
+# cuantos hay disponibles en cada franja: resolvemos bus -> franja con capacidad por franja
+# y los talleres concretos se reparten despues (gen-2.py --agregado)
+
+# definimos los conjuntos de autobuses y franjas horarias (solo franjas con algun taller libre)
+set Autobuses;
+set Franjas;
+
+# parametros
+param suma_pasajeros{a in Autobuses, b in Autobuses} >= 0;            # suma de pasajeros entre buses a y b (matriz m x m) en caso de que estos coincidan
+param capacidad{f in Franjas} integer, >= 0;                           # talleres disponibles en la franja f, sum {t} disponibilidad[f,t]
+
+# variables de decision
+var Asignado{a in Autobuses, f in Franjas} binary;                     # 1 si bus a es asignado a la franja f
+var Coinciden{a in Autobuses, b in Autobuses, f in Franjas: a < b} binary;    # 1 si a y b coinciden en franja f (en talleres distintos)
+#usamos a < b para evitar duplicados (ab, ba coinciden, solo tenemos en cuenta ab)
+
+# funcion objetivo: minimizar el solapamiento de pasajeros comunes entre ab en una misma franja
+minimize UsuariosCoinc:
+    sum {a in Autobuses, b in Autobuses: a < b} sum {f in Franjas} suma_pasajeros[a,b] * Coinciden[a,b,f];
+
+# restricciones
+# 1 - asignacion unica por autobus: cada autobus asignado a una sola franja
+s.t. AsignacionUnica {a in Autobuses}:
+    sum {f in Franjas} Asignado[a,f] = 1;
+
+# 2 - capacidad maxima por franja: como mucho tantos autobuses como talleres disponibles
+s.t. CapMaxima {f in Franjas}:
+    sum {a in Autobuses} Asignado[a,f] <= capacidad[f];
+
+# 3 - enlace de coincidencias (linearizacion)
+
+#acotamos Coinciden por arriba en caso de que a o b no estén asignados a f
+s.t. CoincidenciaA {a in Autobuses, b in Autobuses, f in Franjas: a < b}:
+    Coinciden[a,b,f] <= Asignado[a,f];
+
+s.t. CoincidenciaB {a in Autobuses, b in Autobuses, f in Franjas: a < b}:
+    Coinciden[a,b,f] <= Asignado[b,f];
+
+#si a y b están asignados a f, var Coinciden si o si debe ser 1
+s.t. CoincidenciaAB {a in Autobuses, b in Autobuses, f in Franjas: a < b}:
+    Coinciden[a,b,f] >= Asignado[a,f] + Asignado[b,f] - 1;
+
+end;
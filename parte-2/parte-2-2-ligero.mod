@@ -0,0 +1,44 @@
+# parte-2-2-ligero.mod — Parte 2.2 con la linearizacion reducida
+
+# mismo problema que parte-2-2.mod (y mismo .dat), pero generando solo las filas y columnas necesarias:
+#  - Asignado solo en los huecos (f,t) disponibles, sin restricciones Disponibilidad
+#  - Coinciden solo para pares a < b con suma_pasajeros[a,b] > 0 y franjas con algun hueco
+#  - solo CoincidenciaAB: como el objetivo minimiza suma_pasajeros >= 0 por Coinciden,
+#    las cotas superiores CoincidenciaA y CoincidenciaB son redundantes
+
+# definimos los conjuntos de autobuses, franjas horarias y talleres
+set Autobuses;
+set Franjas;
+set Talleres;
+
+# parametros
+param suma_pasajeros{a in Autobuses, b in Autobuses} >= 0;            # suma de pasajeros entre buses a y b (matriz m x m) en caso de que estos coincidan
+param disponibilidad{f in Franjas, t in Talleres} integer, >= 0, <= 1;   # disponibilidad de la franja f en el taller t; 0 ocupada, 1 libre
+
+# conjuntos derivados
+set Huecos := {f in Franjas, t in Talleres: disponibilidad[f,t] = 1};            # (f,t) libres
+set FranjasLibres := setof {(f,t) in Huecos} f;                                   # franjas con algun hueco
+set Pares := {a in Autobuses, b in Autobuses: a < b and suma_pasajeros[a,b] > 0}; # pares con pasajeros comunes
+
+# variables de decision
+var Asignado{a in Autobuses, (f,t) in Huecos} binary;                  # 1 si bus a es asignado a (f,t)
+var Coinciden{(a,b) in Pares, f in FranjasLibres} binary;              # 1 si a y b coinciden en franja f
+
+# funcion objetivo: minimizar el solapamiento de pasajeros comunes entre ab en una misma franja
+minimize UsuariosCoinc:
+    sum {(a,b) in Pares, f in FranjasLibres} suma_pasajeros[a,b] * Coinciden[a,b,f];
+
+# restricciones
+# 1 - asignacion unica por autobus: cada autobus asignado a un solo hueco libre
+s.t. AsignacionUnica {a in Autobuses}:
+    sum {(f,t) in Huecos} Asignado[a,f,t] = 1;
+
+# 2 - capacidad maxima por hueco (f,t), maximo un autobus
+s.t. CapMaxima {(f,t) in Huecos}:
+    sum {a in Autobuses} Asignado[a,f,t] <= 1;
+
+# 3 - enlace de coincidencias: si a y b están asignados a f, Coinciden debe ser 1
+s.t. CoincidenciaAB {(a,b) in Pares, f in FranjasLibres}:
+    Coinciden[a,b,f] >= sum {t in Talleres: (f,t) in Huecos} Asignado[a,f,t] + sum {t in Talleres: (f,t) in Huecos} Asignado[b,f,t] - 1;
+
+end;
@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+# resolucion del modelo de un taller (parte 2.1): lectura del .in, escritura del .dat, glpsol o
+# resolucion nativa y barrido parametrico de kd/kp. gen-1.py es su programa de linea de comandos y
+# planificador.py su API de alto nivel
+
+import subprocess, tempfile, heapq, hashlib, json, itertools
+from pathlib import Path
+
+import solucion_glpk
+import cache_soluciones
+import metricas
+import barrido
+from comun import ErrorSolucion
+
+# ruta del .mod, junto a este modulo (no depende del directorio de trabajo)
+MODELO = Path(__file__).resolve().parent / "parte-2-1.mod"
+
+# funcion para parsear una linea con numeros separados por espacios o comas
+def parse_nums(linea):
+    partes = linea.replace(',', ' ').split() # reemplazar comas por espacios y dividir
+    return [float(x) for x in partes] # convertir a float
+
+# funcion para leer el .in, devuelve (franjas, buses, coste_distancia, coste_pasajeros, distancias, pasajeros)
+def leer_entrada(in_path):
+    # leer .in
+    lineas = []
+    # abrimos fichero y leemos cada linea
+    with in_path.open("r", encoding="utf-8") as fichero:
+        for linea in fichero: # cada linea del fichero
+            valor = linea.strip() # eliminar espacios en blanco al inicio y final
+            #cada linea no vacia la guardamos
+            if valor: # si la linea no esta vacia --> la guardamos
+                lineas.append(valor)
+    # verificar lineas esperadas
+    try:
+        # numero de franjas n y numero de autobuses m
+        franjas_buses = parse_nums(lineas[0]) # primera linea
+        if len(franjas_buses) != 2: # si no hay dos numeros en la primera linea --> error
+            raise ValueError("Primera línea debe contener n m")
+        franjas = int(franjas_buses[0]) # numero de franjas
+        buses = int(franjas_buses[1]) # numero de autobuses
+
+        #coste_distancia, kd y coste_pasajeros, kp
+        coste_dis_pas = parse_nums(lineas[1])
+        if len(coste_dis_pas) != 2: # si no hay dos numeros en la segunda linea --> error
+            raise ValueError("Segunda línea debe contener kd kp")
+        coste_distancia = coste_dis_pas[0] # coste por distancia
+        coste_pasajeros = coste_dis_pas[1] # coste por pasajero
+
+        #para los dos valores siguientes nos aseguramos de que
+        #el tamaño de la lista coicnide con el numero de buses que tenemos
+        #cada bus m debe tener una distancia y un número de pasajeros
+
+        #distancia a la que se encuentra el bus n del taller
+        dis_vals = parse_nums(lineas[2]); assert len(dis_vals) == buses
+        #numero de pasajeros del autobus n
+        pas_vals = parse_nums(lineas[3]); assert len(pas_vals) == buses
+    # capturar errores de parseo
+    except Exception as e:
+        raise ErrorSolucion("Error al parsear el .in. Formato esperado:\n"
+                            "<n> <m>\n<kd> <kp>\n<d1 ... dm>\n<p1 ... pm>", 4)
+
+    return franjas, buses, coste_distancia, coste_pasajeros, dis_vals, pas_vals
+
+# funcion para escribir el fichero .dat del modelo
+def escribir_dat(dat_path, franjas, buses, coste_distancia, coste_pasajeros, dis_vals, pas_vals):
+    # escribimos el fichero de salida .dat
+    with dat_path.open("w", encoding="utf-8") as salida:
+        # conjuntos
+        salida.write("set Autobuses := " + " ".join(str(bus) for bus in range(1, buses+1)) + ";\n") #todos los autobuses
+        salida.write("set Franjas := " + " ".join(str(franja) for franja in range(1, franjas+1)) + ";\n") #todas las franjas
+        # parametros
+        salida.write(f"param coste_distancia := {coste_distancia};\n") # coste por distancia
+        salida.write(f"param coste_pasajeros := {coste_pasajeros};\n") # coste por pasajero
+        salida.write("param distancia :=\n")
+        #distancia de cada autobus d[a]
+        for bus in range(1, buses+1): # cada autobus
+            salida.write(f"  {bus} {dis_vals[bus-1]}\n") # escribir distancia
+        salida.write(";\n")
+        salida.write("param pasajero :=\n")
+        # escribir el numero de pasajeros de cada autobus p[a]
+        for bus in range(1, buses+1): # cada autobus
+            salida.write(f"  {bus} {pas_vals[bus-1]}\n") # escribir numero de pasajeros
+        salida.write(";\n")
+        salida.write("end;\n")
+
+# funcion para ejecutar glpsol, devuelve la ruta de la solucion en formato raw (--write)
+def ejecutar_glpsol(mod_path, dat_path, dir_temporal, perfil=None):
+    solucion_path = Path(dir_temporal) / "solucion.sol" # ruta del fichero de solucion temporal
+
+    # ejecutar glpsol
+    try:
+        ejecucion = subprocess.run(
+            ["glpsol",
+             "--model", str(mod_path.resolve()),
+             "--data",  str(dat_path.resolve()),
+             "--write", str(solucion_path.resolve())],
+            capture_output=True, text=True, check=False
+        )
+    except FileNotFoundError: # si no se encuentra glpsol --> error
+        raise ErrorSolucion("Error: glpsol no está en PATH. Ejecuta 'glpsol --version' para comprobar.", 5)
+
+    # verificar ejecucion correcta
+    if ejecucion.returncode != 0 or not solucion_path.exists(): # si glpsol falla o no se genera el fichero de solucion --> error
+        raise ErrorSolucion("Error al ejecutar glpsol.", 6)
+
+    if perfil is not None: # estadisticas del solver para --perfil
+        perfil.anadir_glpsol(ejecucion.stdout)
+    return solucion_path
+
+# funcion para leer la solucion raw de glpsol, devuelve (estado, valor optimo, asignados, sin asignar)
+# columnas del modelo: asignado[a,f] (a*n + f) y despues sin_asignar[a] (m*n + a)
+def leer_solucion(solucion_path, franjas, buses):
+    try:
+        estado, valor_optimo, _, columnas, valores = solucion_glpk.leer_mip(solucion_path, buses * franjas + buses)
+    except (OSError, ValueError): # si la solucion no se puede leer --> error
+        raise ErrorSolucion("No se pudo recuperar el valor óptimo desde la salida de GLPK.", 7)
+    if columnas != buses * franjas + buses: # si no corresponde al modelo --> error
+        raise ErrorSolucion("Error al ejecutar glpsol.", 6)
+
+    # asignados y sin asignar
+    asignados = []     # (a,f)
+    sin_asignados = []  # a
+    for columna, actividad in valores.items(): # cada columna con valor distinto de 0
+        if abs(actividad - 1.0) < 1e-9: # si la actividad es 1.0 --> asignado o sin asignar
+            if columna <= buses * franjas: # asignado[a,f]
+                asignados.append(((columna - 1) // franjas + 1, (columna - 1) % franjas + 1))
+            else: # sin_asignar[a]
+                sin_asignados.append(columna - buses * franjas)
+    return estado, valor_optimo, asignados, sin_asignados
+
+# resolucion exacta sin glpsol: cada franja admite un bus, asi que basta con quedarse
+# con los (como mucho) n buses que mas ahorran al atenderse, ahorro = kp*p[a] - kd*d[a] > 0
+# coste O(m log n), devuelve (valor optimo, asignados, sin asignar)
+def resolver_nativo(franjas, buses, coste_distancia, coste_pasajeros, dis_vals, pas_vals):
+    # coste de dejar sin asignar a todos los buses
+    coste_sin_asignar = [coste_pasajeros * pas for pas in pas_vals]
+    # ahorro de atender cada bus frente a dejarlo sin asignar
+    ahorros = [coste_sin_asignar[bus] - coste_distancia * dis_vals[bus] for bus in range(buses)]
+    # los n buses con mas ahorro positivo (nlargest es estable: en empate gana el bus de menor indice)
+    candidatos = (bus for bus in range(buses) if ahorros[bus] > 0)
+    elegidos = sorted(heapq.nlargest(franjas, candidatos, key=ahorros.__getitem__))
+
+    valor_optimo = sum(coste_sin_asignar) - sum(ahorros[bus] for bus in elegidos)
+    # franjas en orden de bus, la franja concreta no cambia el coste
+    asignados = [(bus + 1, franja) for franja, bus in enumerate(elegidos, start=1)]
+    atendidos = set(elegidos)
+    sin_asignados = [bus + 1 for bus in range(buses) if bus not in atendidos]
+    return valor_optimo, asignados, sin_asignados
+
+# huella de los datos parseados de una instancia, para la cache de soluciones
+def huella_instancia(franjas, buses, coste_distancia, coste_pasajeros, dis_vals, pas_vals):
+    datos = json.dumps([franjas, buses, coste_distancia, coste_pasajeros, dis_vals, pas_vals])
+    return hashlib.sha256(datos.encode("ascii")).hexdigest()
+
+# funcion que resuelve una instancia completa y devuelve el resultado como diccionario
+# nativo=True resuelve sin glpsol; comprobar=True ademas lanza glpsol y compara los optimos
+# cache: cache_soluciones.Cache para las resoluciones con glpsol (None = sin cache)
+# perfil: metricas.Perfil donde se miden las fases (None = sin medir)
+# datos: (franjas, buses, coste_distancia, coste_pasajeros, distancias, pasajeros) ya leidos (p.ej. desde
+# planificador.py), en ese caso no se lee in_path
+def resolver(in_path, dat_path, mod_path=MODELO, nativo=False, comprobar=False, cache=None, perfil=None, datos=None):
+    # verificar existencia del .in
+    if datos is None and not in_path.exists(): # si no existe el fichero de entrada --> error
+        raise ErrorSolucion(f"Error: no existe el fichero de entrada: {in_path}", 2)
+    # verificar existencia del modelo (solo hace falta si se usa glpsol)
+    if (not nativo or comprobar) and not mod_path.exists(): # si no existe el modelo --> error
+        raise ErrorSolucion(f"Error: no se encontró el modelo: {mod_path.name}", 3)
+
+    if datos is None:
+        with metricas.fase(perfil, "lectura"):
+            datos = leer_entrada(in_path)
+    franjas, buses, coste_distancia, coste_pasajeros, dis_vals, pas_vals = datos
+
+    # la resolucion nativa es mas barata que calcular la clave, solo se cachea glpsol
+    if cache is not None and not nativo:
+        with metricas.fase(perfil, "cache"):
+            clave = cache_soluciones.clave(huella_instancia(franjas, buses, coste_distancia, coste_pasajeros, dis_vals, pas_vals),
+                                           mod_path, {"resolutor": "glpsol"})
+            resultado = cache.leer(clave)
+        if resultado is not None: # acierto --> sin glpsol, pero el .dat pedido se escribe igual
+            with metricas.fase(perfil, "escritura_dat"):
+                escribir_dat(dat_path, franjas, buses, coste_distancia, coste_pasajeros, dis_vals, pas_vals)
+            return resultado
+
+    if nativo: # resolucion exacta en proceso
+        estado = "INTEGER OPTIMAL"
+        with metricas.fase(perfil, "nativo"):
+            valor_optimo, asignados, sin_asignados = resolver_nativo(franjas, buses, coste_distancia, coste_pasajeros, dis_vals, pas_vals)
+
+    if not nativo or comprobar: # resolucion con glpsol
+        with metricas.fase(perfil, "escritura_dat"):
+            escribir_dat(dat_path, franjas, buses, coste_distancia, coste_pasajeros, dis_vals, pas_vals)
+        # ejecutar GLPK y recoger informacion
+        with tempfile.TemporaryDirectory() as fichero_temporal: # crear un directorio temporal
+            with metricas.fase(perfil, "glpsol"):
+                solucion_path = ejecutar_glpsol(mod_path, dat_path, fichero_temporal, perfil)
+            with metricas.fase(perfil, "lectura_solucion"):
+                estado_glpk, valor_glpk, asignados_glpk, sin_asignados_glpk = leer_solucion(solucion_path, franjas, buses)
+
+        if not nativo: # glpsol es el resultado
+            estado, valor_optimo, asignados, sin_asignados = estado_glpk, valor_glpk, asignados_glpk, sin_asignados_glpk
+        elif abs(valor_optimo - valor_glpk) > 1e-6 * max(1.0, abs(valor_glpk)): # si no coinciden los optimos --> error
+            raise ErrorSolucion(f"Error: el óptimo nativo ({valor_optimo}) no coincide con el de glpsol ({valor_glpk})", 9)
+
+    # contar variables y restricciones
+    num_variables = buses * franjas + buses
+    num_constantes = buses + franjas
+
+    resultado = {
+        "estado": estado,
+        "valor_optimo": valor_optimo,
+        "num_variables": num_variables,
+        "num_restricciones": num_constantes,
+        "asignaciones": [[bus, franja] for bus, franja in sorted(asignados)], # (bus, franja)
+        "sin_asignar": sorted(sin_asignados),
+    }
+    if cache is not None and not nativo: # guardar para la proxima vez
+        cache.guardar(clave, resultado)
+    return resultado
+
+# funcion usada en modo lote: el .dat se escribe en el directorio temporal de cada proceso
+# perfilar=True añade las metricas de la instancia a su linea del .jsonl
+def resolver_instancia(in_path, dir_trabajo, perfilar=False, **opciones):
+    perfil = metricas.Perfil() if perfilar else None
+    resultado = resolver(in_path, Path(dir_trabajo) / (in_path.stem + ".dat"), perfil=perfil, **opciones)
+    if perfil is not None:
+        resultado["perfil"] = perfil.registro()
+    return resultado
+
+# barrido parametrico (--barrido): la instancia se lee una vez, se calculan los tramos de la razon
+# kd/kp con su plan optimo y cada escenario (producto de los valores de kd y kp; el de la instancia
+# si falta uno de los dos) se evalua sobre los tramos; devuelve (tramos, escenarios, costes)
+def barrer(in_path, valores_kd=None, valores_kp=None, perfil=None):
+    # verificar existencia del .in
+    if not in_path.exists(): # si no existe el fichero de entrada --> error
+        raise ErrorSolucion(f"Error: no existe el fichero de entrada: {in_path}", 2)
+    with metricas.fase(perfil, "lectura"):
+        franjas, buses, coste_distancia, coste_pasajeros, dis_vals, pas_vals = leer_entrada(in_path)
+    with metricas.fase(perfil, "barrido"):
+        tramos = barrido.tramos(franjas, dis_vals, pas_vals)
+        escenarios = []
+        if valores_kd is not None or valores_kp is not None:
+            escenarios = list(itertools.product(valores_kd or [coste_distancia], valores_kp or [coste_pasajeros]))
+        costes = barrido.evaluar(tramos, escenarios)
+    return tramos, escenarios, costes
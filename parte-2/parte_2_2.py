@@ -0,0 +1,658 @@
+# -*- coding: utf-8 -*-
+# resolucion del modelo de varios talleres (parte 2.2): lectura del .in (y su cache binaria), escritura
+# del .dat, glpsol (una variante del modelo o la cartera), heuristica, branch and bound y replanificacion
+# incremental. gen-2.py es su programa de linea de comandos y planificador.py su API de alto nivel
+
+import os, re, subprocess, tempfile, hashlib, json
+from array import array
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+
+import heuristica
+import solucion_glpk
+import cache_soluciones
+import metricas
+import glpsol_vivo
+import cartera
+import exacto
+from comun import ErrorSolucion
+
+# rutas de los .mod, junto a este modulo (no dependen del directorio de trabajo)
+MODELO = Path(__file__).resolve().parent / "parte-2-2.mod"
+# variantes del modelo: completo (bus -> franja, taller), agregado (bus -> franja, talleres despues)
+# y ligero (mismo .dat que el completo, solo las filas y columnas necesarias)
+MODELOS = {
+    "completo": MODELO,
+    "agregado": MODELO.with_name("parte-2-2-agregado.mod"),
+    "ligero": MODELO.with_name("parte-2-2-ligero.mod"),
+}
+
+# funcion para parsear una linea de numeros (separados por espacios o comas)
+def parse_nums(linea):
+    # admite espacios o comas como separadores
+    partes = linea.replace(',', ' ').split() # reemplazar comas por espacios y dividir
+    return [float(x) for x in partes] # convertir cada parte a float y devolver lista
+
+# funcion para leer el .in, devuelve (franjas, buses, talleres, suma_pasajeros, disponibilidad)
+# cada fila de suma_pasajeros es un array('d') (floats sin caja); con cache=True se usa un
+# fichero binario junto al .in (<entrada>.in.cache) para no volver a parsear el texto
+def leer_entrada(in_path, cache=False):
+    if cache: # probar primero la cache binaria
+        datos = leer_cache_entrada(in_path)
+        if datos is not None:
+            return datos
+
+    # leer .in, solo lineas no vacias
+    with in_path.open("r", encoding="utf-8") as fichero:
+        lineas = (linea for linea in map(str.strip, fichero) if linea)
+        # verificar lineas esperadas
+        try:
+            # numero de franjas n, numero de autobuses m y numero de talleres u
+            franja_bus_taller = parse_nums(next(lineas)) # primera linea
+            if len(franja_bus_taller) != 3: # si no hay tres numeros en la primera linea --> error
+                raise ValueError("Primera línea debe contener numero de franjas buses talleres")
+            franjas = int(franja_bus_taller[0]) # numero de franjas
+            buses = int(franja_bus_taller[1]) # numero de autobuses
+            talleres = int(franja_bus_taller[2]) # numero de talleres
+
+            # matriz de pasajeros comunes entre los autobuses ab (m filas, m columnas)
+            suma_pasajeros = []
+            for fila in range(buses): # cada fila de la matriz
+                # cada fila se convierte directamente a un array de doubles
+                row = array('d', map(float, next(lineas).replace(',', ' ').split()))
+                # verificar longitud
+                if len(row) != buses: # si la longitud de la fila no es igual al numero de buses --> error
+                    raise ValueError(f"Fila de pasajeros comunes con longitud {len(row)} != numero de buses ({buses})")
+                suma_pasajeros.append(row)
+
+            # matriz de disponibilidad de cada franja n para el taller u
+            # (n filas, u columnas) — disponibilidad por (t,f)
+            disponibilidad = []
+            for fila in range(franjas): # cada fila de la matriz
+                row = parse_nums(next(lineas))
+                # verificar longitud
+                if len(row) != talleres: # si la longitud de la fila no es igual al numero de talleres --> error
+                    raise ValueError(f"Fila de disponibilidad con longitud {len(row)} != numero de talleres ({talleres})")
+                # forzamos a 0/1 enteros por claridad
+                disponibilidad.append([int(round(dispo)) for dispo in row])
+
+        # capturar errores de parseo
+        except Exception as e:
+            if isinstance(e, StopIteration): # faltan lineas, mismo detalle que al indexar una lista
+                e = IndexError("list index out of range")
+            raise ErrorSolucion("Error al parsear el .in de 2.2.\n"
+                                "Formato esperado:\n"
+                                "<n> <m> <u>\n"
+                                "<c11 ... c1m>\n"
+                                "...\n"
+                                "<cm1 ... cmm>\n"
+                                "<o11 ... o1u>\n"
+                                "...\n"
+                                "<on1 ... onu>\n"
+                                f"Detalle: {e}", 4)
+
+    if cache: # guardar la cache para la proxima vez
+        escribir_cache_entrada(in_path, franjas, buses, talleres, suma_pasajeros, disponibilidad)
+    return franjas, buses, talleres, suma_pasajeros, disponibilidad
+
+# cache binaria de un .in: una linea de cabecera JSON (mtime, tamaño y sha256 del .in, dimensiones)
+# seguida de suma_pasajeros (m*m doubles) y disponibilidad (n*u bytes) en binario
+CACHE_VERSION = 1
+
+def ruta_cache_entrada(in_path):
+    return in_path.with_name(in_path.name + ".cache")
+
+def _huella_entrada(in_path):
+    return hashlib.sha256(in_path.read_bytes()).hexdigest()
+
+# devuelve los datos de la cache o None si no existe o no corresponde al .in actual
+def leer_cache_entrada(in_path):
+    cache_path = ruta_cache_entrada(in_path)
+    try:
+        with cache_path.open("rb") as fichero:
+            cabecera = json.loads(fichero.readline())
+            if cabecera.get("version") != CACHE_VERSION:
+                return None
+            estado = in_path.stat()
+            # mismo mtime y tamaño --> valida; si no, se compara el hash del contenido
+            if (cabecera["mtime_ns"], cabecera["tamano"]) != (estado.st_mtime_ns, estado.st_size) \
+                    and cabecera["sha256"] != _huella_entrada(in_path):
+                return None
+            franjas, buses, talleres = cabecera["franjas"], cabecera["buses"], cabecera["talleres"]
+            suma_pasajeros = []
+            for fila in range(buses): # cada fila de la matriz, lectura binaria directa
+                row = array('d')
+                row.fromfile(fichero, buses)
+                suma_pasajeros.append(row)
+            plana = array('b')
+            plana.fromfile(fichero, franjas * talleres)
+    except (OSError, EOFError, ValueError, KeyError): # cache ausente, corrupta o incompleta --> se ignora
+        return None
+    disponibilidad = [list(plana[f*talleres:(f+1)*talleres]) for f in range(franjas)]
+    return franjas, buses, talleres, suma_pasajeros, disponibilidad
+
+def escribir_cache_entrada(in_path, franjas, buses, talleres, suma_pasajeros, disponibilidad):
+    cache_path = ruta_cache_entrada(in_path)
+    estado = in_path.stat()
+    cabecera = {"version": CACHE_VERSION, "mtime_ns": estado.st_mtime_ns, "tamano": estado.st_size,
+                "sha256": _huella_entrada(in_path), "franjas": franjas, "buses": buses, "talleres": talleres}
+    temporal = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        with temporal.open("wb") as fichero:
+            fichero.write(json.dumps(cabecera).encode("utf-8") + b"\n")
+            for row in suma_pasajeros: # cada fila en binario
+                row.tofile(fichero)
+            array('b', [dispo for fila in disponibilidad for dispo in fila]).tofile(fichero)
+        temporal.replace(cache_path) # escritura atomica, otro proceso nunca ve una cache a medias
+    except OSError: # si no se puede escribir (directorio de solo lectura...) --> seguimos sin cache
+        temporal.unlink(missing_ok=True)
+
+# replanificacion incremental: cambios (ruta) modifica celdas de disponibilidad / suma_pasajeros tras leer
+# el .in; previa (ruta) es la solucion anterior, que se repara en los buses afectados y se da a glpsol como
+# solucion de partida (--use); solo_reparar=True devuelve el plan reparado sin llamar a glpsol
+@dataclass(frozen=True)
+class Replanificacion:
+    cambios: Path = None
+    previa: Path = None
+    solo_reparar: bool = False
+
+# funcion para leer un fichero de cambios sobre el .in (replanificacion incremental), una linea por celda:
+#   disponibilidad <franja> <taller> <0|1>
+#   suma_pasajeros <bus_a> <bus_b> <valor>
+# las lineas vacias y las que empiezan por # se ignoran; devuelve [(nombre, i, j, valor)]
+def leer_cambios(cambios_path, franjas, buses, talleres):
+    if not cambios_path.exists(): # si no existe el fichero de cambios --> error
+        raise ErrorSolucion(f"Error: no existe el fichero de cambios: {cambios_path}", 2)
+    limites = {"disponibilidad": (franjas, talleres), "suma_pasajeros": (buses, buses)}
+    cambios = []
+    with cambios_path.open("r", encoding="utf-8") as fichero:
+        for numero, linea in enumerate(fichero, start=1): # cada linea del fichero
+            linea = linea.strip()
+            if not linea or linea.startswith("#"):
+                continue
+            try:
+                nombre, i, j, valor = linea.replace(",", " ").split()
+                i, j, valor = int(i), int(j), float(valor)
+                filas, columnas = limites[nombre]
+                if not (1 <= i <= filas and 1 <= j <= columnas) or valor < 0: # fuera de la instancia --> error
+                    raise ValueError("índice fuera de rango o valor negativo")
+                if nombre == "disponibilidad" and valor not in (0, 1):
+                    raise ValueError("la disponibilidad es 0 o 1")
+            except (ValueError, KeyError) as e:
+                raise ErrorSolucion("Error al parsear los cambios. Formato esperado por línea:\n"
+                                    "disponibilidad <franja> <taller> <0|1>\n"
+                                    "suma_pasajeros <bus_a> <bus_b> <valor>\n"
+                                    f"Detalle (línea {numero}): {e}", 4)
+            cambios.append((nombre, i, j, valor))
+    return cambios
+
+# aplicar los cambios sobre los datos ya leidos; suma_pasajeros se mantiene simetrica
+# devuelve los buses afectados por cambios de suma_pasajeros (los de disponibilidad se ven al reparar)
+def aplicar_cambios(suma_pasajeros, disponibilidad, cambios):
+    afectados = set()
+    for nombre, i, j, valor in cambios: # cada celda cambiada
+        if nombre == "disponibilidad":
+            disponibilidad[i-1][j-1] = int(valor)
+        else:
+            suma_pasajeros[i-1][j-1] = suma_pasajeros[j-1][i-1] = valor
+            afectados.update((i, j))
+    return afectados
+
+# funcion para leer la solucion anterior: el resultado JSON (p.ej. una linea del modo lote) o la
+# salida impresa por gen-2.py ("BUS a asignado a TALLER t en FRANJA f"); devuelve [(bus, franja, taller)]
+def leer_solucion_previa(previa_path):
+    if not previa_path.exists(): # si no existe la solucion anterior --> error
+        raise ErrorSolucion(f"Error: no existe la solución anterior: {previa_path}", 2)
+    texto = previa_path.read_text(encoding="utf-8")
+    try:
+        if texto.lstrip().startswith("{"):
+            asignaciones = [tuple(map(int, asignacion)) for asignacion in json.loads(texto)["asignaciones"]]
+        else:
+            asignaciones = [(int(a), int(f), int(t)) for a, t, f in re.findall(r"BUS (\d+) asignado a TALLER (\d+) en FRANJA (\d+)", texto)]
+    except (ValueError, KeyError, TypeError):
+        asignaciones = []
+    if not asignaciones: # si no hay ninguna asignacion reconocible --> error
+        raise ErrorSolucion(f"Error: no se reconoce la solución anterior: {previa_path}", 4)
+    return asignaciones
+
+# tamaño del buffer de escritura del .dat (las matrices grandes se escriben por filas completas)
+BUFFER_DAT = 1 << 20
+
+# escribir param suma_pasajeros; denso = tabla m x m, disperso = default 0 y solo los pares a < b
+# distintos de cero (los unicos que usa el modelo)
+def escribir_suma_pasajeros(salida, buses, suma_pasajeros, disperso=False):
+    if disperso:
+        salida.write("param suma_pasajeros default 0 :=\n")
+        for bus_a, row in enumerate(suma_pasajeros, start=1): # cada bus_a, solo su triangulo superior
+            salida.writelines(f"  {bus_a} {bus_b} {valor}\n" for bus_b, valor in enumerate(row[bus_a:], start=bus_a+1) if valor)
+    else:
+        # parametro suma_pasajeros (m x m), indexado por bus_a, bus_b en Autobuses
+        salida.write("param suma_pasajeros : " + " ".join(map(str, range(1, buses+1))) + " :=\n")
+        # cada fila se formatea de una vez con map(str, ...)
+        salida.writelines(f"  {bus_a} " + " ".join(map(str, row)) + "\n" for bus_a, row in enumerate(suma_pasajeros, start=1))
+    salida.write(";\n")
+
+# funcion para escribir el fichero .dat del modelo
+def escribir_dat(dat_path, franjas, buses, talleres, suma_pasajeros, disponibilidad, disperso=False):
+    # escribir el fichero de salida .dat
+    with dat_path.open("w", encoding="utf-8", buffering=BUFFER_DAT) as salida:
+        # conjuntos
+        salida.write("set Autobuses := " + " ".join(map(str, range(1, buses+1))) + ";\n") # todos los autobuses
+        salida.write("set Franjas := " + " ".join(map(str, range(1, franjas+1))) + ";\n") # todas las franjas
+        salida.write("set Talleres := " + " ".join(map(str, range(1, talleres+1))) + ";\n") # todos los talleres
+        escribir_suma_pasajeros(salida, buses, suma_pasajeros, disperso)
+        salida.write("#matriz que representa la suma de pasajeros de los autobuses a y b\n")
+        # parametro disponibilidad (n x u), escrito como filas franja (Franjas) y columnas taller (Talleres):
+        salida.write("param disponibilidad : " + " ".join(map(str, range(1, talleres+1))) + " :=\n")
+        salida.writelines(f"  {franja} " + " ".join(map(str, row)) + "\n" for franja, row in enumerate(disponibilidad, start=1)) # escribimos fila franja
+        salida.write(";\n")
+        salida.write("#matriz que representa la disponibilidad de franjas en cada taller, filas = franjas, columnas = talleres\n")
+        salida.write("end;\n")
+
+# funcion para escribir el .dat del modelo agregado: solo franjas con algun taller disponible
+# y su capacidad (numero de talleres disponibles) en lugar de la matriz de disponibilidad
+def escribir_dat_agregado(dat_path, buses, suma_pasajeros, capacidades, disperso=False):
+    with dat_path.open("w", encoding="utf-8", buffering=BUFFER_DAT) as salida:
+        # conjuntos
+        salida.write("set Autobuses := " + " ".join(map(str, range(1, buses+1))) + ";\n") # todos los autobuses
+        salida.write("set Franjas := " + " ".join(map(str, capacidades)) + ";\n") # franjas con capacidad
+        escribir_suma_pasajeros(salida, buses, suma_pasajeros, disperso)
+        # parametro capacidad (talleres disponibles por franja)
+        salida.write("param capacidad :=\n")
+        salida.writelines(f"  {franja} {capacidad}\n" for franja, capacidad in capacidades.items()) # cada franja con capacidad
+        salida.write(";\n")
+        salida.write("end;\n")
+
+# escribir el .dat de la variante del modelo; datos: (franjas, buses, talleres, suma_pasajeros, disponibilidad)
+def escribir_dat_modelo(dat_path, modelo, datos, disperso=False):
+    franjas, buses, talleres, suma_pasajeros, disponibilidad = datos
+    if modelo == "agregado": # talleres disponibles por franja, solo franjas con alguno
+        capacidades = {franja: sum(fila) for franja, fila in enumerate(disponibilidad, start=1) if sum(fila) > 0}
+        escribir_dat_agregado(dat_path, buses, suma_pasajeros, capacidades, disperso)
+    else:
+        escribir_dat(dat_path, franjas, buses, talleres, suma_pasajeros, disponibilidad, disperso)
+
+# funcion para ejecutar glpsol, devuelve la ruta de la solucion en formato raw (--write)
+# con tiempo_limite (s) glpsol para al agotarlo (--tmlim) y deja la mejor solucion entera encontrada;
+# con tiempo_limite o al_progresar la salida se lee en vivo y cada linea del branch and bound
+# se pasa a al_progresar(evento) en cuanto glpsol la escribe
+# inicial_path: solucion de partida (--use), glpsol la toma como incumbente y poda con su valor
+def ejecutar_glpsol(mod_path, dat_path, dir_temporal, perfil=None, tiempo_limite=None, al_progresar=None, inicial_path=None):
+    solucion_path = Path(dir_temporal) / "solucion.sol" # ruta del fichero de solucion temporal
+    orden = ["glpsol", "--model", str(mod_path.resolve()), "--data", str(dat_path.resolve()), "--write", str(solucion_path.resolve())]
+    if inicial_path is not None:
+        orden += ["--use", str(inicial_path.resolve())]
+
+    # ejecutar glpsol
+    try:
+        if tiempo_limite is None and al_progresar is None:
+            ejecucion = subprocess.run(orden, capture_output=True, text=True, check=False)
+            codigo, salida = ejecucion.returncode, ejecucion.stdout
+        else:
+            if tiempo_limite is not None: # glpsol solo admite segundos enteros
+                orden += ["--tmlim", str(max(1, int(tiempo_limite)))]
+            codigo, salida, _, parado = glpsol_vivo.ejecutar(orden, tiempo_limite, al_progresar)
+            if parado: # ni siquiera ha llegado a escribir una solucion --> sin resultado
+                raise ErrorSolucion("No se ha encontrado el valor óptimo", 7)
+    except FileNotFoundError: # si glpsol no se encuentra --> error
+        raise ErrorSolucion("Error: glpsol no está en PATH. Comprueba 'glpsol --version'.", 5)
+
+    # verificar ejecucion correcta
+    if codigo != 0 or not solucion_path.exists(): # si glpsol falla o no se genera el fichero de solucion --> error
+        raise ErrorSolucion("Error al ejecutar glpsol.", 6)
+
+    if perfil is not None: # estadisticas del solver para --perfil
+        perfil.anadir_glpsol(salida)
+    return solucion_path
+
+# funcion para lanzar la cartera: un glpsol por configuracion, cada uno con su .sol, y la heuristica
+# la cota inferior de partida es 0 (el objetivo suma pasajeros >= 0)
+# devuelve (configuracion ganadora, estado, objetivo, solucion, segundos); solucion es la ruta del .sol
+# del glpsol ganador o la tupla que devuelve la heuristica
+def ejecutar_cartera(mod_path, dat_path, dir_temporal, configuraciones, heuristica_cartera, perfil=None, tiempo_limite=None, al_progresar=None,
+                     inicial_path=None):
+    ordenes = {}
+    for nombre in configuraciones: # cada configuracion de glpsol
+        solucion_path = Path(dir_temporal) / f"solucion-{nombre}.sol"
+        orden = ["glpsol", "--model", str(mod_path.resolve()), "--data", str(dat_path.resolve()),
+                 "--write", str(solucion_path.resolve())] + cartera.CONFIGURACIONES[nombre]
+        if tiempo_limite is not None: # glpsol solo admite segundos enteros
+            orden += ["--tmlim", str(max(1, int(tiempo_limite)))]
+        if inicial_path is not None: # todos parten de la misma solucion
+            orden += ["--use", str(inicial_path.resolve())]
+        ordenes[nombre] = (orden, solucion_path)
+
+    try:
+        ganador = cartera.correr(ordenes, heuristica_cartera, tiempo_limite, 0.0, al_progresar)
+    except FileNotFoundError: # si glpsol no se encuentra --> error
+        raise ErrorSolucion("Error: glpsol no está en PATH. Comprueba 'glpsol --version'.", 5)
+    if ganador is None or ganador[1] == "INTEGER EMPTY": # nadie encuentra solucion o es infactible --> error
+        raise ErrorSolucion("No se ha encontrado el valor óptimo", 7)
+
+    configuracion, estado, objetivo, solucion, salida, segundos = ganador
+    if perfil is not None and salida: # estadisticas del glpsol ganador para --perfil
+        perfil.anadir_glpsol(salida)
+    return configuracion, estado, objetivo, solucion, segundos
+
+# funcion para escribir una solucion de partida para glpsol --use, en el mismo formato raw que --write
+# glpsol exige una linea por fila pero solo usa los valores de las columnas, asi que las filas van a 0;
+# las columnas siguen el orden del modelo: Asignado (destinos de cada bus) y despues Coinciden
+def escribir_solucion_inicial(sol_path, modelo, franjas, buses, suma_pasajeros, disponibilidad, destinos,
+                              asignaciones, valor, num_vars, num_cons):
+    franja_de = [0] * (buses + 1)
+    destino_de = [None] * (buses + 1)
+    for a, f, t in asignaciones: # franja y destino de cada bus
+        franja_de[a] = f
+        destino_de[a] = (f,) if modelo == "agregado" else (f, t)
+    # franjas de Coinciden: todas en el completo, solo las que tienen algun hueco en el agregado y el ligero
+    franjas_coinc = range(1, franjas+1) if modelo == "completo" else [f for f in range(1, franjas+1) if any(disponibilidad[f-1])]
+    with sol_path.open("w", encoding="utf-8", buffering=BUFFER_DAT) as salida:
+        salida.write(f"s mip {num_cons + 1} {num_vars} f {valor}\n") # + 1 por la fila del objetivo
+        salida.writelines(f"i {fila} 0\n" for fila in range(1, num_cons + 2))
+        columna = 0
+        for a in range(1, buses+1): # Asignado
+            for destino in destinos:
+                columna += 1
+                salida.write(f"j {columna} {int(destino == destino_de[a])}\n")
+        for a in range(1, buses+1): # Coinciden, pares a < b (en el ligero solo con pasajeros comunes)
+            for b in range(a+1, buses+1):
+                if modelo == "ligero" and not suma_pasajeros[a-1][b-1] > 0:
+                    continue
+                for f in franjas_coinc:
+                    columna += 1
+                    salida.write(f"j {columna} {int(franja_de[a] == franja_de[b] == f)}\n")
+        salida.write("e o f\n")
+
+# destinos de la variable Asignado de cada modelo, en el orden en que glpsol numera sus columnas
+# (para cada bus, todos sus destinos): (f,t) en el completo, (f,) en el agregado, huecos (f,t) en el ligero
+def destinos_asignado(modelo, franjas, talleres, disponibilidad):
+    if modelo == "agregado":
+        return [(f,) for f in range(1, franjas+1) if any(disponibilidad[f-1])]
+    if modelo == "ligero":
+        return [(f, t) for f in range(1, franjas+1) for t in range(1, talleres+1) if disponibilidad[f-1][t-1] == 1]
+    return [(f, t) for f in range(1, franjas+1) for t in range(1, talleres+1)]
+
+# funcion para leer la solucion raw de glpsol, devuelve (estado, valor optimo, asignaciones)
+# Asignado son las primeras buses*len(destinos) columnas; las de Coinciden ni se leen
+def leer_solucion(solucion_path, buses, destinos, num_vars):
+    try:
+        estado, valor_optimo, _, columnas, valores = solucion_glpk.leer_mip(solucion_path, buses * len(destinos))
+    except (OSError, ValueError): # si no se puede leer la solucion --> error
+        raise ErrorSolucion("No se ha encontrado el valor óptimo", 7)
+    if columnas != num_vars: # si la solucion no corresponde al modelo --> error
+        raise ErrorSolucion("Error al ejecutar glpsol.", 6)
+
+    # estados que NO permiten imprimir objetivo
+    estado_malo = ("INFEASIBLE", "NO PRIMAL", "NO FEASIBLE", "UNDEFINED", "UNBOUNDED")
+    if any(x in estado for x in estado_malo): # si el estado es malo --> error
+        raise ErrorSolucion("No se ha encontrado el valor óptimo", 7)
+
+    # acepta soluciones óptimas (entera si hay binarias) y, con limite de tiempo, la mejor entera factible
+    estado_bueno = ("INTEGER OPTIMAL", "INTEGER NON-OPTIMAL", "OPTIMAL")
+    if not any(x in estado for x in estado_bueno): # si el estado no es bueno --> error
+        raise ErrorSolucion("No se ha encontrado el valor óptimo", 7)
+
+    # todas las asignaciones que valen 1
+    asignaciones = []
+    for columna, actividad in valores.items(): # cada columna de Asignado distinta de 0
+        if abs(actividad - 1.0) < 1e-9: # si el valor es 1 --> asignacion
+            bus, destino = divmod(columna - 1, len(destinos))
+            asignaciones.append((bus + 1,) + destinos[destino])
+
+    return estado, valor_optimo, asignaciones
+
+# funcion para contar variables y restricciones del modelo parte-2-2 (o de su variante)
+# en el modelo agregado, franjas es el numero de franjas con algun taller disponible
+def contar_modelo(franjas, buses, talleres, modelo="completo"):
+    # conteo de variables y restricciones
+    pares = buses * (buses - 1) // 2 #entre 2 para no tener en cuenta los duplicados
+    if modelo == "agregado":
+        vars_asignaciones = buses * franjas # Asignado[a,f]
+        cons_cap_max = franjas # cada franja tiene como mucho tantos buses como talleres libres
+        cons_dispo = 0 # la disponibilidad va en la capacidad de cada franja
+    else:
+        vars_asignaciones = buses * franjas * talleres
+        cons_cap_max = franjas * talleres      #cada par (franja, taller) puede tener max 1 bus, cada combi franja taller hay una restricción
+        cons_dispo = buses * franjas * talleres    #si una franja no está disponible, no se puede asignar bus. restriccion para cada m, u, n.
+    vars_coincidencias = pares * franjas
+    num_vars = vars_asignaciones + vars_coincidencias
+
+    # restricciones
+    cons_asignado = buses         #cada bus necesita exactamente una asignacion, 1 restriccion asignado por cada bus
+    cons_coinc = 3 * (pares * franjas)
+    #tenemos tres restricciones para cada par ab en cada franja
+    num_cons = cons_asignado + cons_cap_max + cons_dispo + cons_coinc
+    return num_vars, num_cons
+
+# funcion para contar variables y restricciones del modelo ligero, que depende de los datos:
+# huecos (f,t) libres, franjas con algun hueco y pares a < b con pasajeros comunes
+def contar_modelo_ligero(buses, suma_pasajeros, disponibilidad):
+    huecos = sum(map(sum, disponibilidad))
+    franjas_libres = sum(1 for fila in disponibilidad if any(fila))
+    pares = sum(1 for a in range(buses) for b in range(a + 1, buses) if suma_pasajeros[a][b] > 0)
+    num_vars = buses * huecos + pares * franjas_libres # Asignado en huecos + Coinciden en pares
+    num_cons = buses + huecos + pares * franjas_libres # AsignacionUnica + CapMaxima + CoincidenciaAB
+    return num_vars, num_cons
+
+# reparto de talleres tras el modelo agregado: en cada franja, los buses (en orden)
+# ocupan los talleres disponibles de esa franja (en orden); devuelve [(bus, franja, taller)]
+def repartir_talleres(asignaciones_franja, disponibilidad):
+    libres = {}
+    asignaciones = []
+    for bus, franja in sorted(asignaciones_franja): # cada (bus, franja)
+        if franja not in libres: # talleres disponibles de la franja, en orden
+            libres[franja] = iter([taller for taller, dispo in enumerate(disponibilidad[franja-1], start=1) if dispo])
+        asignaciones.append((bus, franja, next(libres[franja])))
+    return asignaciones
+
+# huella de los datos parseados de una instancia, para la cache de soluciones
+def huella_instancia(franjas, buses, talleres, suma_pasajeros, disponibilidad):
+    h = hashlib.sha256(f"{franjas} {buses} {talleres}\n".encode("ascii"))
+    for row in suma_pasajeros: # cada fila en binario, sin pasar por texto
+        h.update(array('d', row).tobytes())
+    h.update(bytes(dispo for fila in disponibilidad for dispo in fila))
+    return h.hexdigest()
+
+# campos del resultado que se guardan en la cache de soluciones
+CAMPOS_CACHE = ("estado", "valor_optimo", "num_variables", "num_restricciones", "asignaciones")
+
+# funcion que resuelve una instancia completa y devuelve el resultado como diccionario
+# modelo: variante del .mod que resuelve glpsol ("completo", "agregado" o "ligero")
+# metodo: "glpsol", "heuristica" (recocido simulado) o "exacto" (branch and bound en proceso, exacto.py)
+# comprobar=True resuelve ademas el modelo completo y exige que los optimos coincidan
+# cache_entrada=True usa la cache binaria del .in; dat_disperso=True escribe suma_pasajeros en formato disperso
+# cache: cache_soluciones.Cache de resultados (None = sin cache); perfil: metricas.Perfil (None = sin medir)
+# tiempo_limite: segundos para glpsol, al agotarlos se devuelve la mejor solucion factible ("INTEGER NON-OPTIMAL")
+# al_progresar: funcion a la que se pasa cada incumbente y cota de glpsol en cuanto aparecen
+# configuraciones: nombres de cartera.CONFIGURACIONES que compiten a la vez junto a la heuristica (None = un solo glpsol)
+# replanificacion: Replanificacion con los cambios sobre el .in y la solucion anterior (None = resolver de cero)
+# datos: (franjas, buses, talleres, suma_pasajeros, disponibilidad) ya leidos (p.ej. desde planificador.py),
+# en ese caso no se lee in_path
+def resolver(in_path, dat_path, mod_path=None, metodo="glpsol", modelo="completo", comprobar=False,
+             cache_entrada=False, dat_disperso=False, iteraciones=None, tiempo=None, semilla=0, cache=None, perfil=None,
+             tiempo_limite=None, al_progresar=None, configuraciones=None, replanificacion=None, datos=None):
+    mod_path = mod_path or MODELOS[modelo]
+    replanificacion = replanificacion or Replanificacion()
+    # verificar existencia del .in
+    if datos is None and not in_path.exists(): # si no existe el fichero de entrada --> error
+        raise ErrorSolucion(f"Error: no existe el fichero de entrada: {in_path}", 2)
+    # verificar existencia del modelo .mod (solo hace falta si se usa glpsol)
+    if metodo == "glpsol" and not mod_path.exists(): # si no existe el modelo .mod --> error
+        raise ErrorSolucion(f"Error: no se encontró el modelo: {mod_path.name}", 3)
+
+    if datos is None:
+        with metricas.fase(perfil, "lectura"):
+            datos = leer_entrada(in_path, cache_entrada)
+    franjas, buses, talleres, suma_pasajeros, disponibilidad = datos
+    afectados = set()
+    if replanificacion.cambios is not None: # la instancia es el .in con las celdas cambiadas
+        with metricas.fase(perfil, "cambios"):
+            afectados = aplicar_cambios(suma_pasajeros, disponibilidad,
+                                        leer_cambios(replanificacion.cambios, franjas, buses, talleres))
+    if metodo == "glpsol" and modelo == "agregado":
+        # talleres disponibles por franja, solo franjas con alguno
+        capacidades = {franja: sum(fila) for franja, fila in enumerate(disponibilidad, start=1) if sum(fila) > 0}
+        num_vars, num_cons = contar_modelo(len(capacidades), buses, talleres, modelo)
+    elif metodo == "glpsol" and modelo == "ligero":
+        num_vars, num_cons = contar_modelo_ligero(buses, suma_pasajeros, disponibilidad)
+    else:
+        num_vars, num_cons = contar_modelo(franjas, buses, talleres)
+
+    # cache de resultados: la clave incluye el .mod (con glpsol) y las opciones que cambian el resultado
+    if cache is not None:
+        if metodo == "heuristica":
+            opciones_clave = {"metodo": metodo, "iteraciones": iteraciones, "tiempo": tiempo, "semilla": semilla}
+        else:
+            opciones_clave = {"metodo": metodo, "modelo": modelo}
+        with metricas.fase(perfil, "cache"):
+            clave = cache_soluciones.clave(huella_instancia(franjas, buses, talleres, suma_pasajeros, disponibilidad),
+                                           mod_path if metodo == "glpsol" else None, opciones_clave)
+            resultado = None if comprobar else cache.leer(clave) # comprobar siempre vuelve a resolver
+        if resultado is not None: # acierto --> sin glpsol, pero el .dat pedido se escribe igual
+            if metodo == "glpsol":
+                with metricas.fase(perfil, "escritura_dat"):
+                    escribir_dat_modelo(dat_path, modelo, datos, dat_disperso)
+            return resultado
+
+    reparada = None
+    if metodo == "glpsol" and replanificacion.previa is not None: # reparar el plan anterior solo en los buses afectados
+        with metricas.fase(perfil, "reparacion"):
+            reparada = heuristica.reparar(suma_pasajeros, franjas, disponibilidad, leer_solucion_previa(replanificacion.previa),
+                                          afectados)
+        if reparada is None: # si no hay huecos para todos los buses --> infactible
+            raise ErrorSolucion("No se ha encontrado el valor óptimo", 7)
+
+    if metodo == "heuristica": # busqueda local, sin glpsol
+        with metricas.fase(perfil, "heuristica"):
+            solucion = heuristica.recocido_simulado(suma_pasajeros, franjas, disponibilidad, iteraciones, tiempo, semilla)
+        if solucion is None: # si no hay huecos para todos los buses --> infactible
+            raise ErrorSolucion("No se ha encontrado el valor óptimo", 7)
+        estado = "HEURISTICA"
+        valor_optimo, asignaciones, _ = solucion
+        extra = {}
+    elif metodo == "exacto": # branch and bound en proceso, con limite de tiempo la mejor solucion encontrada
+        with metricas.fase(perfil, "exacto"):
+            solucion = exacto.resolver(suma_pasajeros, franjas, disponibilidad, tiempo_limite)
+        if solucion is None: # si no hay huecos para todos los buses --> infactible
+            raise ErrorSolucion("No se ha encontrado el valor óptimo", 7)
+        valor_optimo, asignaciones, optimo, cota, nodos = solucion
+        estado = "INTEGER OPTIMAL" if optimo else "INTEGER NON-OPTIMAL"
+        extra = {"nodos": nodos}
+        if not optimo: # cota de la raiz y gap como los de glpsol
+            extra.update(cota=cota, gap_pct=100.0 * abs(valor_optimo - cota) / max(abs(valor_optimo), 1e-9))
+        if comprobar and optimo: # sin optimo demostrado no hay nada que comparar
+            comprobar_optimo(in_path, datos, valor_optimo, "branch and bound", perfil, tiempo_limite)
+    elif reparada is not None and (replanificacion.solo_reparar or reparada[0] <= 0):
+        # plan reparado sin glpsol; con valor 0 ya es optimo (el objetivo es >= 0)
+        estado = "INTEGER OPTIMAL" if reparada[0] <= 0 else "REPARADA"
+        valor_optimo, asignaciones, reubicados = reparada
+        extra = {"afectados": reubicados}
+    else:
+        ultimos = {} # ultimo evento del branch and bound de cada configuracion, para la cota y el gap
+        def progresar(actual):
+            ultimos[actual.get("configuracion")] = actual
+            if al_progresar is not None:
+                al_progresar(actual)
+        vivo = tiempo_limite is not None or al_progresar is not None or configuraciones
+        estado, valor_optimo, asignaciones, extra = resolver_glpsol(in_path, dat_path, mod_path, modelo, comprobar, dat_disperso,
+                                                                    datos, (num_vars, num_cons), perfil, tiempo_limite,
+                                                                    progresar if vivo else None, configuraciones, reparada)
+        if reparada is not None: # valor del plan reparado del que ha partido glpsol
+            extra.update(valor_reparado=reparada[0], afectados=reparada[2])
+
+    resultado = {
+        "estado": estado,
+        "valor_optimo": valor_optimo,
+        "num_variables": num_vars,
+        "num_restricciones": num_cons,
+        "asignaciones": [[a, f, t] for a, f, t in sorted(asignaciones)], # (bus, franja, taller)
+    }
+    resultado.update(extra)
+    if estado == "INTEGER NON-OPTIMAL" and metodo == "glpsol": # limite agotado: mejor solucion factible, con su cota y gap
+        ultimo = ultimos.get(extra.get("configuracion"), {})
+        resultado.update(cota=ultimo.get("cota"), gap_pct=ultimo.get("gap_pct"))
+    if cache is not None and (metodo == "heuristica" or es_optimo(estado)):
+        # guardar para la proxima vez (solo optimos o la heuristica pedida), sin los datos de como se ha
+        # resuelto (configuracion de la cartera, plan reparado, nodos...): la clave no depende de ellos
+        cache.guardar(clave, {campo: resultado[campo] for campo in CAMPOS_CACHE})
+    return resultado
+
+# resolucion con glpsol de la variante elegida del modelo (o con la cartera si hay configuraciones)
+# datos: (franjas, buses, talleres, suma_pasajeros, disponibilidad); tamano: (num_vars, num_cons) del modelo
+# inicial: plan reparado (valor, asignaciones, afectados) como solucion de partida (None = sin ella)
+# devuelve (estado, valor optimo, asignaciones, datos extra del resultado)
+def resolver_glpsol(in_path, dat_path, mod_path, modelo, comprobar, dat_disperso, datos, tamano, perfil=None,
+                    tiempo_limite=None, al_progresar=None, configuraciones=None, inicial=None):
+    franjas, buses, talleres, suma_pasajeros, disponibilidad = datos
+    num_vars, num_cons = tamano
+    with metricas.fase(perfil, "escritura_dat"):
+        escribir_dat_modelo(dat_path, modelo, datos, dat_disperso)
+
+    # ejecutar GLPK y resolver
+    destinos = destinos_asignado(modelo, franjas, talleres, disponibilidad)
+    extra = {}
+    with tempfile.TemporaryDirectory() as fichero_temporal: # crear un directorio temporal
+        inicial_path = None
+        if inicial is not None: # plan reparado como solucion de partida
+            inicial_path = Path(fichero_temporal) / "inicial.sol"
+            escribir_solucion_inicial(inicial_path, modelo, franjas, buses, suma_pasajeros, disponibilidad, destinos,
+                                      inicial[1], inicial[0], num_vars, num_cons)
+        with metricas.fase(perfil, "glpsol"):
+            if configuraciones:
+                # la heuristica compite con el mismo limite de tiempo (o su presupuesto por defecto)
+                heuristica_cartera = partial(heuristica.recocido_simulado, suma_pasajeros, franjas, disponibilidad, None, tiempo_limite)
+                configuracion, estado, valor_optimo, solucion, segundos = ejecutar_cartera(
+                    mod_path, dat_path, fichero_temporal, configuraciones, heuristica_cartera, perfil, tiempo_limite, al_progresar,
+                    inicial_path)
+                extra = {"configuracion": configuracion, "tiempo_cartera_s": round(segundos, 3)}
+            else:
+                solucion = ejecutar_glpsol(mod_path, dat_path, fichero_temporal, perfil, tiempo_limite, al_progresar, inicial_path)
+        if configuraciones and configuracion == "heuristica": # ya viene con (bus, franja, taller)
+            _, asignaciones, _ = solucion
+        else:
+            with metricas.fase(perfil, "lectura_solucion"):
+                estado, valor_optimo, asignaciones = leer_solucion(solucion, buses, destinos, num_vars)
+            if inicial is not None and (len(asignaciones) != buses or valor_optimo > inicial[0] + 1e-6 * max(1.0, abs(inicial[0]))):
+                # glpsol no ha mejorado la solucion de partida (y con preproceso no la reescribe): se queda el
+                # plan reparado; el estado de glpsol sigue valiendo (OPTIMAL --> el plan reparado es optimo)
+                valor_optimo, asignaciones = inicial[0], inicial[1]
+            elif modelo == "agregado": # el modelo agregado solo da la franja, repartimos los talleres
+                asignaciones = repartir_talleres(asignaciones, disponibilidad)
+
+    # comprobar la variante contra el modelo completo (solo si es un optimo demostrado: con el limite de
+    # tiempo agotado la solucion factible no tiene por que coincidir)
+    if comprobar and modelo != "completo" and es_optimo(estado):
+        comprobar_optimo(in_path, datos, valor_optimo, f"modelo {modelo}", perfil, tiempo_limite)
+
+    return estado, valor_optimo, asignaciones, extra
+
+# estado con el optimo demostrado (no la heuristica, ni el plan reparado, ni el limite de tiempo agotado)
+def es_optimo(estado):
+    return "OPTIMAL" in estado and estado != "INTEGER NON-OPTIMAL"
+
+# resolver el modelo completo con glpsol y exigir que su optimo coincida con valor_optimo (codigo 9 si no)
+# tiempo_limite: el mismo limite para la referencia; si lo agota, su valor es solo una solucion factible
+# y valor_optimo solo puede fallar si es peor que ella, y si no encuentra ninguna no hay con que comparar
+def comprobar_optimo(in_path, datos, valor_optimo, nombre, perfil=None, tiempo_limite=None):
+    with tempfile.TemporaryDirectory() as dir_referencia, metricas.fase(perfil, "comprobacion"):
+        try:
+            referencia = resolver(in_path, Path(dir_referencia) / "completo.dat", datos=datos, tiempo_limite=tiempo_limite)
+        except ErrorSolucion as e:
+            if e.codigo != 7 or tiempo_limite is None: # sin limite, referencia infactible --> error de verdad
+                raise
+            return
+    diferencia = valor_optimo - referencia["valor_optimo"]
+    if not es_optimo(referencia["estado"]): # referencia sin optimo demostrado --> solo cuenta si es mejor
+        diferencia = max(diferencia, 0.0)
+    if abs(diferencia) > 1e-6 * max(1.0, abs(referencia["valor_optimo"])): # si no coinciden --> error
+        raise ErrorSolucion(f"Error: el óptimo del {nombre} ({valor_optimo}) no coincide con el del modelo completo ({referencia['valor_optimo']})", 9)
+
+# funcion usada en modo lote: el .dat se escribe en el directorio temporal de cada proceso
+# perfilar=True añade las metricas de la instancia a su linea del .jsonl
+def resolver_instancia(in_path, dir_trabajo, perfilar=False, **opciones):
+    perfil = metricas.Perfil() if perfilar else None
+    resultado = resolver(in_path, Path(dir_trabajo) / (in_path.stem + ".dat"), perfil=perfil, **opciones)
+    if perfil is not None:
+        resultado["perfil"] = perfil.registro()
+    return resultado
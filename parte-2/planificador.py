@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# API de alto nivel sobre parte_2_1.py y parte_2_2.py (instancias como objetos o diccionarios, sin .in)
+# y servicio persistente: un solo proceso que lee instancias JSON por stdin (o por un socket Unix) y
+# devuelve una linea JSON por resultado, sin pagar por peticion el arranque del interprete ni los imports
+#
+#   import planificador
+#   resultado = planificador.resolver_2_2("prueba2-1.in", modelo="ligero")
+#   resultado = planificador.resolver_2_1({"franjas": 2, "buses": 3, "coste_distancia": 1, ...}, nativo=True)
+
+import sys, json, atexit, shutil, tempfile, threading, socketserver
+from array import array
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+
+import cache_soluciones
+import parte_2_1
+import parte_2_2
+from comun import ErrorSolucion, Argumentos
+
+USAGE = ("Uso: python planificador.py [--socket RUTA] [opciones de cache]\n"
+         "     cada linea de entrada: {\"id\": ..., \"parte\": \"2.1\"|\"2.2\", \"instancia\": {...}|\"fichero.in\", \"opciones\": {...}}")
+
+# instancia de la parte 2.1 (un taller)
+@dataclass
+class Instancia21:
+    franjas: int
+    buses: int
+    coste_distancia: float
+    coste_pasajeros: float
+    distancias: list
+    pasajeros: list
+
+# instancia de la parte 2.2 (varios talleres); suma_pasajeros m x m, disponibilidad n x u con 0/1
+@dataclass
+class Instancia22:
+    franjas: int
+    buses: int
+    talleres: int
+    suma_pasajeros: list
+    disponibilidad: list
+
+# resultado de la parte 2.1: asignaciones (bus, franja) y buses sin asignar
+@dataclass
+class Resultado21:
+    estado: str
+    valor_optimo: float
+    num_variables: int
+    num_restricciones: int
+    asignaciones: list
+    sin_asignar: list
+
+# resultado de la parte 2.2: asignaciones (bus, franja, taller); extra lleva los datos que dependen del
+# metodo (cota y gap con limite de tiempo, configuracion ganadora de la cartera...)
+@dataclass
+class Resultado22:
+    estado: str
+    valor_optimo: float
+    num_variables: int
+    num_restricciones: int
+    asignaciones: list
+    extra: dict = field(default_factory=dict)
+
+# directorio de trabajo del proceso para los .dat, se crea una vez y se borra al salir
+_dir_trabajo = None
+_cerrojo = threading.Lock()
+
+def _ruta_dat():
+    global _dir_trabajo
+    with _cerrojo:
+        if _dir_trabajo is None:
+            _dir_trabajo = tempfile.mkdtemp(prefix="planificador-")
+            atexit.register(shutil.rmtree, _dir_trabajo, True)
+    return Path(_dir_trabajo) / f"{threading.get_ident()}.dat" # un .dat por hilo
+
+# instancia a partir de un diccionario (p.ej. una linea JSON), comprobando las dimensiones
+def _desde_dict(clase, datos):
+    try:
+        instancia = clase(**datos)
+    except TypeError as e: # campos que faltan o sobran
+        raise ErrorSolucion(f"Error: instancia no valida: {e}", 4)
+    if clase is Instancia21:
+        correcta = len(instancia.distancias) == len(instancia.pasajeros) == instancia.buses
+    else:
+        correcta = (len(instancia.suma_pasajeros) == instancia.buses
+                    and all(len(fila) == instancia.buses for fila in instancia.suma_pasajeros)
+                    and len(instancia.disponibilidad) == instancia.franjas
+                    and all(len(fila) == instancia.talleres for fila in instancia.disponibilidad))
+    if not correcta: # si las listas no coinciden con las dimensiones --> error
+        raise ErrorSolucion("Error: las dimensiones de la instancia no coinciden con sus listas", 4)
+    return instancia
+
+# (ruta del .in, datos con el formato de leer_entrada() de cada parte): la instancia puede ser un
+# objeto, un diccionario o la ruta de un .in (que lee el propio modulo, con sus errores)
+def _datos(clase, instancia):
+    if isinstance(instancia, (str, Path)):
+        return Path(instancia), None
+    if isinstance(instancia, dict):
+        instancia = _desde_dict(clase, instancia)
+    if not isinstance(instancia, clase):
+        raise ErrorSolucion(f"Error: instancia no valida: {type(instancia).__name__}", 4)
+    if clase is Instancia21:
+        return None, (int(instancia.franjas), int(instancia.buses), float(instancia.coste_distancia), float(instancia.coste_pasajeros),
+                      [float(d) for d in instancia.distancias], [float(p) for p in instancia.pasajeros])
+    return None, (int(instancia.franjas), int(instancia.buses), int(instancia.talleres),
+                  [array('d', map(float, fila)) for fila in instancia.suma_pasajeros], # copias: la resolucion no toca el original
+                  [[int(round(dispo)) for dispo in fila] for fila in instancia.disponibilidad])
+
+# resolver una instancia de la parte 2.1; opciones de parte_2_1.resolver (nativo, comprobar, cache, perfil)
+def resolver_2_1(instancia, **opciones):
+    in_path, datos = _datos(Instancia21, instancia)
+    resultado = parte_2_1.resolver(in_path, _ruta_dat(), datos=datos, **opciones)
+    return Resultado21(resultado["estado"], resultado["valor_optimo"], resultado["num_variables"], resultado["num_restricciones"],
+                       [tuple(asignacion) for asignacion in resultado["asignaciones"]], list(resultado["sin_asignar"]))
+
+# resolver una instancia de la parte 2.2; opciones de parte_2_2.resolver (metodo, modelo, tiempo_limite,
+# configuraciones, cache, perfil...)
+def resolver_2_2(instancia, **opciones):
+    in_path, datos = _datos(Instancia22, instancia)
+    resultado = parte_2_2.resolver(in_path, _ruta_dat(), datos=datos, **opciones)
+    basicos = ("estado", "valor_optimo", "num_variables", "num_restricciones", "asignaciones")
+    return Resultado22(resultado["estado"], resultado["valor_optimo"], resultado["num_variables"], resultado["num_restricciones"],
+                       [tuple(asignacion) for asignacion in resultado["asignaciones"]],
+                       {clave: valor for clave, valor in resultado.items() if clave not in basicos})
+
+# servicio: resolutor y opciones admitidas en una peticion de cada parte (nada de rutas ni funciones)
+PARTES = {
+    "2.1": (resolver_2_1, {"nativo", "comprobar"}),
+    "2.2": (resolver_2_2, {"metodo", "modelo", "comprobar", "dat_disperso", "iteraciones", "tiempo", "semilla",
+                           "tiempo_limite", "configuraciones"}),
+}
+
+# atender una peticion (una linea JSON); devuelve el registro de respuesta, nunca lanza excepciones
+# los errores van en el registro como en el modo lote: estado ERROR, mensaje y codigo de salida
+def atender(linea, cache=None):
+    registro = {}
+    try:
+        try:
+            peticion = json.loads(linea)
+        except ValueError as e: # linea que no es JSON --> error de parseo
+            raise ErrorSolucion(f"Error: peticion no valida: {e}", 4)
+        if not isinstance(peticion, dict):
+            raise ErrorSolucion("Error: cada peticion debe ser un objeto JSON", 1)
+        if "id" in peticion: # identificador de la peticion, se devuelve tal cual
+            registro["id"] = peticion["id"]
+        if peticion.get("parte") not in PARTES:
+            raise ErrorSolucion(f"Error: parte desconocida: {peticion.get('parte')}", 1)
+        resolutor, admitidas = PARTES[peticion["parte"]]
+        opciones = peticion.get("opciones", {})
+        if not set(opciones) <= admitidas:
+            raise ErrorSolucion(f"Error: opciones no admitidas: {sorted(set(opciones) - admitidas)}", 1)
+        registro.update(asdict(resolutor(peticion.get("instancia"), cache=cache, **opciones)))
+    except Exception as e: # cualquier error queda en la respuesta de esa peticion
+        registro["estado"] = "ERROR"
+        registro["error"] = str(e)
+        registro["codigo"] = getattr(e, "codigo", None)
+    return registro
+
+# atender las peticiones de un flujo de lineas y escribir cada respuesta en cuanto esta lista
+def servir(entrada, salida, cache=None):
+    for linea in entrada: # cada peticion
+        if linea.strip():
+            salida.write(json.dumps(atender(linea, cache), ensure_ascii=False) + "\n")
+            salida.flush()
+
+# servidor en un socket Unix: cada conexion es un flujo de peticiones, cada una en su hilo
+class _Conexion(socketserver.StreamRequestHandler):
+    def handle(self):
+        entrada = (linea.decode("utf-8") for linea in self.rfile)
+        servir(entrada, _Escritor(self.wfile), self.server.cache)
+
+# escritura de texto sobre el socket
+class _Escritor:
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, texto):
+        self.wfile.write(texto.encode("utf-8"))
+
+    def flush(self):
+        self.wfile.flush()
+
+# funcion principal: servicio por stdin/stdout o por socket Unix
+def main():
+    parser = Argumentos(USAGE)
+    parser.add_argument("--socket", default=None) # ruta del socket Unix (por defecto stdin/stdout)
+    cache_soluciones.anadir_argumentos(parser)
+    args = parser.parse_args()
+    cache = cache_soluciones.desde_argumentos(args)
+
+    if args.socket is None:
+        servir(sys.stdin, sys.stdout, cache)
+        return
+    Path(args.socket).unlink(missing_ok=True)
+    with socketserver.ThreadingUnixStreamServer(args.socket, _Conexion) as servidor:
+        servidor.cache = cache
+        print(f"escuchando en {args.socket}", file=sys.stderr)
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            Path(args.socket).unlink(missing_ok=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+# lectura de la solucion MIP que escribe glpsol con --write (formato "raw" de glp_write_mip):
+#   c ...                               comentarios
+#   s mip <filas> <columnas> <estado> <objetivo>
+#   i <fila> <valor>                    una por fila
+#   j <columna> <valor>                 una por columna, en orden
+#   e o f
+# las columnas van numeradas en el orden de declaracion de las variables del .mod y, dentro de
+# cada variable, en el orden de sus conjuntos, asi que el indice se traduce a nombre con aritmetica
+
+# estado MIP con los mismos textos que el informe de glpsol --output
+ESTADOS_MIP = {
+    "o": "INTEGER OPTIMAL",
+    "f": "INTEGER NON-OPTIMAL",
+    "n": "INTEGER EMPTY",
+    "u": "INTEGER UNDEFINED",
+}
+
+# error de formato en el fichero de solucion
+class ErrorFormato(ValueError):
+    pass
+
+# lee la solucion en una sola pasada y sin guardar el fichero en memoria
+# solo se devuelven las columnas 1..hasta_columna con valor distinto de 0 (las demas ni se
+# convierten: la lectura se corta en cuanto se pasa de hasta_columna)
+# devuelve (estado, objetivo, filas, columnas, {columna: valor})
+def leer_mip(sol_path, hasta_columna):
+    cabecera = None
+    valores = {}
+    with open(sol_path, "r", encoding="utf-8") as fichero:
+        for linea in fichero: # cada linea del fichero
+            tipo = linea[:1]
+            if tipo == "j": # valor de una columna
+                _, columna, valor = linea.split()
+                columna = int(columna)
+                if columna > hasta_columna: # el resto de columnas no interesa --> parar
+                    break
+                valor = float(valor)
+                if valor: # solo los valores distintos de 0
+                    valores[columna] = valor
+            elif tipo == "s": # cabecera con el estado y el objetivo
+                partes = linea.split()
+                if len(partes) != 6 or partes[1] != "mip":
+                    raise ErrorFormato(f"Cabecera de solución no reconocida: {linea.strip()}")
+                cabecera = (ESTADOS_MIP.get(partes[4], "UNDEFINED"), float(partes[5]), int(partes[2]), int(partes[3]))
+            elif tipo == "e": # fin del fichero
+                break
+    if cabecera is None: # sin cabecera no hay solucion
+        raise ErrorFormato("El fichero de solución no tiene cabecera 's mip'")
+    return cabecera + (valores,)
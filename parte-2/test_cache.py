@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+# un acierto de la cache de soluciones no llama a glpsol pero escribe igualmente el .dat pedido, identico
+# al de la primera resolucion
+#   python -m unittest test_cache
+
+import sys, shutil, unittest, subprocess, tempfile
+from pathlib import Path
+
+DIRECTORIO = Path(__file__).resolve().parent
+
+@unittest.skipUnless(shutil.which("glpsol"), "glpsol no está en PATH")
+class TestCache(unittest.TestCase):
+    def test_acierto_escribe_dat(self):
+        casos = [("gen-1.py", "prueba1-1.in"), ("gen-2.py", "prueba2-1.in"), ("gen-2.py", "prueba2-1.in", "--agregado")]
+        with tempfile.TemporaryDirectory() as dir_trabajo:
+            dat_path = Path(dir_trabajo) / "salida.dat"
+            for script, instancia, *opciones in casos: # cada script y variante
+                with self.subTest(script=script, opciones=opciones):
+                    orden = [sys.executable, str(DIRECTORIO / script), str(DIRECTORIO / instancia), str(dat_path),
+                             "--dir-cache", str(Path(dir_trabajo) / "cache"), *opciones]
+                    primera = subprocess.run(orden, capture_output=True, text=True, check=True).stdout
+                    dat = dat_path.read_bytes()
+                    dat_path.unlink()
+                    self.assertEqual(subprocess.run(orden, capture_output=True, text=True, check=True).stdout, primera)
+                    self.assertEqual(dat_path.read_bytes(), dat)
+
+if __name__ == "__main__":
+    unittest.main()
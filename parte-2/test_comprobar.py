@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+# --comprobar con --tiempo-limite: si la resolucion de referencia del modelo completo no encuentra ninguna
+# solucion dentro del limite no hay con que comparar, y el optimo demostrado no debe dar error
+#   python -m unittest test_comprobar
+
+import sys, shutil, unittest, subprocess, tempfile
+from pathlib import Path
+
+from test_ligero import DIRECTORIO, ejecutar
+
+@unittest.skipUnless(shutil.which("glpsol"), "glpsol no está en PATH")
+class TestComprobar(unittest.TestCase):
+    def test_referencia_sin_solucion(self):
+        with tempfile.TemporaryDirectory() as dir_trabajo:
+            # instancia con optimo 0 que el branch and bound demuestra enseguida y en la que glpsol no
+            # encuentra ninguna solucion entera en 1 s
+            subprocess.run([sys.executable, str(DIRECTORIO / "generador.py"), "2", dir_trabajo, "--franjas", "6",
+                            "--buses", "24", "--talleres", "5", "--densidad", "0.5"], capture_output=True, check=True)
+            in_path = next(Path(dir_trabajo).glob("*.in"))
+            self.assertEqual(ejecutar(in_path, dir_trabajo, "--exacto", "--tiempo-limite", "1", "--comprobar"), (0, 0.0))
+
+    def test_prueba_con_limite(self):
+        with tempfile.TemporaryDirectory() as dir_trabajo:
+            for in_path in sorted(DIRECTORIO.glob("prueba2-[123].in")): # cada instancia factible
+                with self.subTest(instancia=in_path.name):
+                    completo = ejecutar(in_path, dir_trabajo)
+                    self.assertEqual(ejecutar(in_path, dir_trabajo, "--exacto", "--tiempo-limite", "5", "--comprobar"), completo)
+                    self.assertEqual(ejecutar(in_path, dir_trabajo, "--ligero", "--tiempo-limite", "5", "--comprobar"), completo)
+
+if __name__ == "__main__":
+    unittest.main()
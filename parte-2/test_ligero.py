@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+# el modelo ligero (--ligero) debe dar el mismo optimo y el mismo codigo de salida que el modelo
+# completo en todos los prueba2-*.in (prueba2-4 es infactible: codigo 7 en los dos)
+#   python -m unittest test_ligero
+
+import re, sys, shutil, unittest, subprocess, tempfile
+from pathlib import Path
+
+DIRECTORIO = Path(__file__).resolve().parent
+RE_VALOR = re.compile(r"^valor \S+ = (-?[\d.]+)")
+
+# ejecutar gen-2.py sobre una instancia, devuelve (codigo de salida, valor optimo o None)
+def ejecutar(in_path, dir_trabajo, *opciones):
+    proceso = subprocess.run([sys.executable, str(DIRECTORIO / "gen-2.py"), str(in_path), str(Path(dir_trabajo) / "prueba.dat"),
+                              "--sin-cache", *opciones], capture_output=True, text=True, check=False)
+    valor = RE_VALOR.match(proceso.stdout)
+    return proceso.returncode, float(valor.group(1)) if valor else None
+
+@unittest.skipUnless(shutil.which("glpsol"), "glpsol no está en PATH")
+class TestLigero(unittest.TestCase):
+    def test_mismo_optimo_que_el_completo(self):
+        instancias = sorted(DIRECTORIO.glob("prueba2-*.in"))
+        self.assertTrue(instancias)
+        with tempfile.TemporaryDirectory() as dir_trabajo:
+            for in_path in instancias: # cada instancia de prueba
+                with self.subTest(instancia=in_path.name):
+                    completo = ejecutar(in_path, dir_trabajo)
+                    ligero = ejecutar(in_path, dir_trabajo, "--ligero")
+                    self.assertEqual(completo, ligero)
+                    self.assertEqual(ejecutar(in_path, dir_trabajo, "--ligero", "--dat-disperso"), completo)
+
+    def test_infactible(self):
+        with tempfile.TemporaryDirectory() as dir_trabajo:
+            self.assertEqual(ejecutar(DIRECTORIO / "prueba2-4.in", dir_trabajo), (7, None))
+            self.assertEqual(ejecutar(DIRECTORIO / "prueba2-4.in", dir_trabajo, "--ligero"), (7, None))
+
+if __name__ == "__main__":
+    unittest.main()